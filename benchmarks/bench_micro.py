@@ -0,0 +1,249 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_backend import TyremateApp  # noqa: E402
+from tyremate_decode import unpack_frames  # noqa: E402
+from tyremate_qr import QRRenderer  # noqa: E402
+from tyremate_replay import synthetic_frame  # noqa: E402
+
+FIELDS = {"datetime": True, "pressure": True, "temperature": True, "battery": True, "raw": True}
+DEFAULT_THRESHOLD = 10.0
+
+
+def measure(fn, ops, rounds):
+    # fn(ops) performs `ops` operations; per-op time is taken per round so outliers show up as spread
+    fn(max(1, ops // 10))  # warm-up: caches, lazy imports, first connection
+    per_op = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(ops)
+        per_op.append((time.perf_counter() - started) / ops * 1e6)
+    return {
+        "ops": ops,
+        "rounds": rounds,
+        "median_us": statistics.median(per_op),
+        "min_us": min(per_op),
+        "stdev_us": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "ops_per_sec": 1e6 / statistics.median(per_op),
+    }
+
+
+def build_cases(app):
+    frames = [synthetic_frame(i % 8, i) for i in range(4096)]
+    now = time.time()
+    readings = [app.decode_tyremate_notification(frame, now) for frame in frames]
+    cases = {}
+
+    def decode(ops):
+        for i in range(ops):
+            app.decode_tyremate_notification(frames[i & 4095], now)
+    cases["decode_tyremate_notification"] = decode
+
+    try:
+        block = b"".join(frames)
+        unpack_frames(block)
+
+        def decode_batch(ops):
+            for _ in range(ops):
+                unpack_frames(block)
+        # One op is 4096 frames
+        cases["unpack_frames_x4096"] = decode_batch
+    except ImportError:
+        pass
+
+    def validate(ops):
+        for i in range(ops):
+            app.validator.check_frame(frames[i & 4095], now)
+            app.validator.check_reading(readings[i & 4095])
+    cases["validate_frame"] = validate
+
+    def qr_payload(ops):
+        for i in range(ops):
+            app.qr_renderer.payload(readings[i & 4095], "1000")
+    cases["qr_payload"] = qr_payload
+
+    uncached = QRRenderer(FIELDS, "|", cache_size=1)
+    counter = iter(range(10 ** 9))
+
+    def qr_render(ops):
+        for _ in range(ops):
+            uncached.render(f"1000|32.14|25|3.0|{next(counter)}")
+    cases["qr_render_uncached"] = qr_render
+
+    def qr_render_cached(ops):
+        for _ in range(ops):
+            app.qr_renderer.render("1000|32.14|25|3.0")
+    cases["qr_render_cached"] = qr_render_cached
+
+    def generate_qr(ops):
+        for i in range(ops):
+            app.generate_qr_code(readings[i & 7], readings[i & 7].sensor_id)
+    cases["generate_qr_code_repeat"] = generate_qr
+
+    def save(ops):
+        # Includes the batched INSERT: rows are flushed at the end of every round
+        for i in range(ops):
+            app.save_to_database(readings[i & 4095])
+        app.writer.flush()
+    cases["save_to_database"] = save
+
+    def alerts(ops):
+        for i in range(ops):
+            app.alerts.update(readings[i & 4095])
+    cases["alerts_update"] = alerts
+
+    app.log_writer.open()
+
+    def log(ops):
+        for i in range(ops):
+            app.log_to_notepad(readings[i & 4095])
+    cases["log_to_notepad"] = log
+
+    def append(ops):
+        for _ in range(ops):
+            app.append_to_data_display("📥 Received: A01000000001444D960000000000000000000000\n")
+        app.ui_messages.clear()
+    cases["append_to_data_display"] = append
+
+    try:
+        import tkinter as tk
+        from tkinter import scrolledtext
+        root = tk.Tk()
+        root.withdraw()
+        widget = scrolledtext.ScrolledText(root)
+
+        def write_panel(ops):
+            for _ in range(ops):
+                app.write_panel(widget, "Sensor ID: 1000, Pressure: 32.14 PSI, Temp: 25°C, Volt: 3.0V\n")
+        cases["write_panel"] = write_panel
+    except Exception as e:
+        # No display: the Tk half of the append path cannot be measured here
+        print(f"write_panel skipped: {e}")
+    return cases
+
+
+OPS = {
+    "decode_tyremate_notification": 100000,
+    "unpack_frames_x4096": 200,
+    "validate_frame": 100000,
+    "qr_payload": 50000,
+    "qr_render_uncached": 100,
+    "qr_render_cached": 100000,
+    "generate_qr_code_repeat": 5000,
+    "save_to_database": 20000,
+    "alerts_update": 100000,
+    "log_to_notepad": 50000,
+    "append_to_data_display": 100000,
+    "write_panel": 2000,
+}
+
+
+def run(args):
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            config = {
+                "fields": FIELDS, "separator": "|", "log_enabled": True, "metrics_enabled": False,
+                "db_backend": "sqlite", "sqlite_path": os.path.join(workdir, "bench.sqlite"),
+                "db_batch_size": 1000, "db_flush_interval": 60.0,
+            }
+            app = TyremateApp(None, config)
+            deadline = time.monotonic() + 10
+            while not app.db_ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # The text-append helpers are no-ops headless; measure the queueing they do in the GUI
+            app.headless = False
+            cases = build_cases(app)
+            for name, fn in cases.items():
+                if args.only and not any(part in name for part in args.only.split(",")):
+                    continue
+                ops = max(1, int(OPS[name] * args.scale))
+                results[name] = measure(fn, ops, args.rounds)
+                r = results[name]
+                print(f"{name:<30} {r['median_us']:>10.3f} us/op  (min {r['min_us']:.3f}, ±{r['stdev_us']:.3f})"
+                      f"  {r['ops_per_sec']:>12,.0f} ops/s")
+            app.headless = True
+            app.shutdown()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def metadata():
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+    try:
+        meta["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        pass
+    return meta
+
+
+def compare(base_path, new_path, threshold):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"base: {base['meta'].get('commit', '?')} {base['meta']['created']}   "
+          f"new: {new['meta'].get('commit', '?')} {new['meta']['created']}")
+    regressions = 0
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        if name not in base["results"] or name not in new["results"]:
+            print(f"{name:<30} only in {'new' if name in new['results'] else 'base'}")
+            continue
+        before = base["results"][name]["median_us"]
+        after = new["results"][name]["median_us"]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "improved"
+        print(f"{name:<30} {before:>10.3f} -> {after:>10.3f} us/op  {change:>+7.1f}%  {flag}")
+    print(f"{regressions} regression(s) beyond {threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless micro-benchmarks of the per-reading hot paths")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the operations per round")
+    parser.add_argument("--only", help="comma-separated substrings of benchmark names to run")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="percent slowdown of the median that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
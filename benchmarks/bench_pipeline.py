@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_backend import TyremateApp  # noqa: E402
+
+SUSTAINED_RATIO = 0.99
+SAMPLE_CAPTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_capture.txt")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def base_config(args, workdir):
+    config = {
+        "log_enabled": args.log,
+        "separator": "|",
+        "fields": {"datetime": True, "pressure": True, "temperature": True, "battery": True, "raw": True},
+        "frame_source": args.source,
+        "dedup_window": args.dedup_window,
+        "db_flush_interval": args.flush_interval,
+        "validate_frames": args.validate,
+    }
+    if args.db == "sqlite":
+        config.update({"db_backend": "sqlite", "sqlite_path": os.path.join(workdir, "bench.sqlite")})
+    else:
+        config.update({"host": args.host, "port": args.port, "user": args.user, "password": args.password})
+    if args.replay_file:
+        config["replay_file"] = args.replay_file
+    return config
+
+
+def run_once(args, workdir, rate, sensors):
+    config = base_config(args, workdir)
+    config.update({"replay_rate": rate, "replay_sensors": sensors})
+    app = TyremateApp(None, config)
+    latencies = []
+    app.writer.on_flush = lambda rows, committed_at: latencies.extend(
+        committed_at - row[0].timestamp() for row in rows
+    )
+
+    # The schema is created on the DB executor; start offering frames once it is in place
+    deadline = time.monotonic() + 10
+    while not app.db_ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    app.scanning = True
+    future = asyncio.run_coroutine_threadsafe(app.scan_and_connect(), app.loop)
+    time.sleep(args.duration)
+    app.scanning = False
+    future.result(timeout=10)
+    offered = app.frame_source.sent
+    # Frames the validator turned away are never committed, so they do not count against the rate
+    rejected = app.validator.total_rejected()
+    loop_lag = app.loop_monitor.stats()
+    achieved = app.frame_source.achieved_rate()
+    app.shutdown()
+
+    committed = app.writer.rows_written
+    stages = app.pipeline.stats()
+    return {
+        "rate": rate,
+        "sensors": sensors,
+        "offered": offered,
+        "achieved_rate": round(achieved, 1),
+        "committed": committed,
+        "dropped": stages["decode"]["dropped"] + stages["persist"]["dropped"],
+        "qr_dropped": stages["qr"]["dropped"],
+        "deduplicated": app.dedup.total_suppressed(),
+        "rejected": rejected,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "loop_lag_p99_ms": round(loop_lag["p99_ms"], 2),
+        "loop_lag_max_ms": round(loop_lag["max_ms"], 2),
+        "sustained": offered > rejected and committed >= (offered - rejected) * SUSTAINED_RATIO
+        and achieved >= rate * SUSTAINED_RATIO,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frames through TyremateApp and measure end-to-end throughput")
+    parser.add_argument("--source", choices=("synthetic", "replay"), default="synthetic")
+    parser.add_argument("--replay-file", help="log to replay when --source=replay (default benchmarks/sample_capture.txt)")
+    parser.add_argument("--rates", default="50,200,1000,5000", help="comma-separated frames/sec to offer")
+    parser.add_argument("--sensors", default="1,8", help="comma-separated sensor counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per configuration")
+    parser.add_argument("--db", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="3307")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--flush-interval", type=float, default=0.2)
+    parser.add_argument("--dedup-window", type=float, default=0.0)
+    parser.add_argument("--no-validate", dest="validate", action="store_false",
+                        help="skip header and range checks, e.g. to replay a raw capture with garbage frames")
+    parser.add_argument("--log", action="store_true", help="also write the notepad log")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # TyremateApp's basicConfig would otherwise point at a log inside the temporary workdir
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+    if args.replay_file is None and args.source == "replay":
+        args.replay_file = SAMPLE_CAPTURE
+    if args.replay_file:
+        # Resolved before the run moves into its temporary directory
+        args.replay_file = os.path.abspath(args.replay_file)
+
+    rates = [float(r) for r in args.rates.split(",")]
+    sensor_counts = [int(s) for s in args.sensors.split(",")]
+    results = []
+    summary = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # QR images and the notepad log use relative paths; keep them out of the checkout
+        os.chdir(workdir)
+        try:
+            for sensors in sensor_counts:
+                summary[sensors] = 0.0
+                for rate in rates:
+                    result = run_once(args, workdir, rate, sensors)
+                    results.append(result)
+                    print(f"sensors={sensors:<3} rate={rate:>8.0f}/s achieved={result['achieved_rate']:>8.1f}/s "
+                          f"committed={result['committed']:<7} dropped={result['dropped']:<6} qr_dropped={result['qr_dropped']:<6} "
+                          f"rejected={result['rejected']:<6} "
+                          f"p50={result['p50_ms']:>8.2f} ms p99={result['p99_ms']:>8.2f} ms "
+                          f"loop_lag_p99={result['loop_lag_p99_ms']:>6.2f} ms "
+                          f"{'ok' if result['sustained'] else 'NOT SUSTAINED'}")
+                    if result["sustained"]:
+                        summary[sensors] = max(summary[sensors], rate)
+        finally:
+            os.chdir(cwd)
+
+    for sensors, rate in summary.items():
+        print(f"max sustained rate with {sensors} sensor(s): {rate:.0f} frames/s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "max_sustained": summary}, f, indent=4)
+    # An empty pipeline is not a throughput figure: say why and fail
+    empty = [r for r in results if not r["committed"]]
+    for r in empty:
+        print(f"ERROR: nothing committed with {r['sensors']} sensor(s) at {r['rate']:.0f}/s "
+              f"({r['offered']} offered, {r['rejected']} rejected, {r['deduplicated']} deduplicated)", file=sys.stderr)
+    if empty:
+        if any(r["rejected"] for r in empty):
+            print("ERROR: the validator rejected the replayed frames; use a valid capture or --no-validate", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
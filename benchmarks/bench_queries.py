@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_db import MIGRATIONS, ConnectionManager, SQLiteManager, migrate_schema  # noqa: E402
+from tyremate_queries import ReadingQueries  # noqa: E402
+
+INSERT_CHUNK = 10000
+# The table starts at schema version 1, before ingest_id existed
+INSERT_QUERY = """
+    INSERT INTO sensor_readings
+    (timestamp, sensor_id, pressure_psi, temperature, voltage, raw_data, qr_code_path)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def populate(manager, database, rows, sensors):
+    # Only the first migration runs here, so the data starts out in the old index-less shape
+    with manager.connection(database) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS schema_version")
+        cursor.execute("DROP TABLE IF EXISTS sensor_readings")
+        MIGRATIONS[0](cursor, manager.dialect, "sensor_readings")
+        conn.commit()
+        query = INSERT_QUERY.replace("%s", manager.placeholder)
+        start = datetime.now() - timedelta(seconds=rows)
+        sensor_ids = [f"{0x1000 + i:04X}" for i in range(sensors)]
+        rng = random.Random(1)
+        batch = []
+        for i in range(rows):
+            batch.append((
+                start + timedelta(seconds=i),
+                sensor_ids[i % sensors],
+                round(rng.uniform(28, 36), 2),
+                round(rng.uniform(15, 40), 2),
+                3.0,
+                "A0" + "00" * 19,
+                None,
+            ))
+            if len(batch) >= INSERT_CHUNK:
+                cursor.executemany(query, batch)
+                batch = []
+        if batch:
+            cursor.executemany(query, batch)
+        conn.commit()
+        cursor.close()
+    return start, sensor_ids
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_queries(queries, start, rows, sensor_ids, repeat):
+    sensor = sensor_ids[len(sensor_ids) // 2]
+    last_hour = (start + timedelta(seconds=rows - 3600), start + timedelta(seconds=rows))
+    return {
+        "latest_per_sensor": timed(queries.latest_per_sensor, repeat),
+        "range_last_hour": timed(lambda: queries.range(sensor, *last_hour), repeat),
+        "count_sensor": timed(lambda: queries.count(sensor), repeat),
+        "count_last_hour": timed(lambda: queries.count(None, *last_hour), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time sensor_readings queries before and after the index migration")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sensors", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="3307")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="tyremate_bench")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.db == "sqlite":
+            manager = SQLiteManager(os.path.join(workdir, "bench.sqlite"))
+        else:
+            manager = ConnectionManager(args.host, args.port, args.user, args.password)
+            manager.ensure_database(args.database)
+
+        started = time.perf_counter()
+        start, sensor_ids = populate(manager, args.database, args.rows, args.sensors)
+        print(f"inserted {args.rows} rows for {args.sensors} sensors in {time.perf_counter() - started:.1f} s")
+
+        queries = ReadingQueries(manager, args.database)
+        before = run_queries(queries, start, args.rows, sensor_ids, args.repeat)
+        started = time.perf_counter()
+        migrate_schema(manager, args.database)
+        print(f"migration (index build) took {time.perf_counter() - started:.1f} s")
+        after = run_queries(queries, start, args.rows, sensor_ids, args.repeat)
+
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<18} no index {before[name]:>10.2f} ms   indexed {after[name]:>8.2f} ms   x{speedup:,.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "sensors": args.sensors, "before_ms": before, "after_ms": after}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("bleak", "mysql", "qrcode", "PIL", "numpy")
+
+# Each probe runs in a fresh interpreter so every import is cold
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+TTI_PROBE = """
+import json, sys, time, logging
+started = time.perf_counter()
+logging.basicConfig(handlers=[logging.NullHandler()])
+result = {{}}
+try:
+    import tkinter as tk
+    root = tk.Tk()
+except Exception as e:
+    root = None
+    result["display"] = str(e)
+if root is not None:
+    from main import UnifiedTyremateApp
+    app = UnifiedTyremateApp(root)
+    root.update()
+    result["config_tab"] = time.perf_counter() - started
+    tab_started = time.perf_counter()
+    app.start_scan_in_scan_tab({config!r})
+    root.update()
+    result["scan_tab"] = time.perf_counter() - tab_started
+    scan_app = app.scan_app
+else:
+    from tyremate_backend import TyremateApp
+    tab_started = time.perf_counter()
+    scan_app = TyremateApp(None, {config!r})
+    result["scan_tab_headless"] = time.perf_counter() - tab_started
+# DB initialisation runs in the background; record when it settled either way
+while scan_app.db_executor.calls == 0 and time.perf_counter() - tab_started < 30:
+    time.sleep(0.01)
+result["db_settled"] = time.perf_counter() - tab_started
+result["db_ready"] = scan_app.db_ready
+result["loaded"] = [m for m in {heavy!r} if m in sys.modules]
+scan_app.shutdown()
+if root is not None:
+    root.destroy()
+print(json.dumps(result))
+"""
+
+
+def probe(code, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-interactive of the two tabs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--host", default="127.0.0.1", help="MySQL host for the scan tab; unreachable by default")
+    parser.add_argument("--port", default="1")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    config = {"host": args.host, "port": args.port, "user": "root", "password": "", "fields": {}}
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in ("tyremate_gui", "tyremate_backend", "main"):
+            runs = [probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES), workdir) for _ in range(args.repeat)]
+            results[f"import {module}"] = {
+                "median_ms": statistics.median(r["seconds"] for r in runs) * 1000,
+                "heavy_loaded": runs[0]["loaded"],
+            }
+        runs = [probe(TTI_PROBE.format(config=config, heavy=HEAVY_MODULES), workdir) for _ in range(args.repeat)]
+
+    for name, result in results.items():
+        print(f"{name:<24} {result['median_ms']:>8.1f} ms   heavy modules loaded: {', '.join(result['heavy_loaded']) or 'none'}")
+    if "display" in runs[0]:
+        print(f"no display ({runs[0]['display']}); scan tab measured headless")
+    for key in ("config_tab", "scan_tab", "scan_tab_headless", "db_settled"):
+        if key in runs[0]:
+            median = statistics.median(r[key] for r in runs) * 1000
+            results[key] = median
+            label = "DB init settled after" if key == "db_settled" else f"{key.replace('_', ' ')} interactive after"
+            print(f"{label:<32} {median:>8.1f} ms")
+    print(f"DB reachable: {runs[0]['db_ready']}; heavy modules loaded after the scan tab opened: "
+          f"{', '.join(runs[0]['loaded']) or 'none'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "runs": runs}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
 from tyremate_gui import TyremateGUI  # your config class
-from tyremate_backend import TyremateApp     # your main scan class
 
 class UnifiedTyremateApp:
     def __init__(self, root):
@@ -19,18 +18,36 @@ class UnifiedTyremateApp:
         self.tabs.add(self.config_frame, text="Configuration")
         self.tabs.add(self.scan_frame, text="Scan")
 
+        self.scan_app = None
+
         # Inject config tab with callback to switch to scan tab
-        self.config_page = TyremateGUI(self.config_frame, self.start_scan_in_scan_tab)
+        self.config_page = TyremateGUI(self.config_frame, self.start_scan_in_scan_tab, self.open_rollup_buckets)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def start_scan_in_scan_tab(self, config):
+        # Flush and stop the previous scan session before replacing it
+        if self.scan_app:
+            self.scan_app.shutdown()
+        # The scan backend (asyncio, pipeline, DB writers) is only imported once a scan is started
+        from tyremate_backend import TyremateApp
         # Clear any old widgets in scan tab
         for widget in self.scan_frame.winfo_children():
             widget.destroy()
         # Load scan UI into scan_frame
-        TyremateApp(self.scan_frame, config)
+        self.scan_app = TyremateApp(self.scan_frame, config)
         # Switch to scan tab
         self.tabs.select(self.scan_frame)
 
+    def open_rollup_buckets(self, resolution):
+        # Buckets the scan session is still filling, so History in the table viewer shows them too
+        return self.scan_app.rollups.open_rows(resolution) if self.scan_app else []
+
+    def on_closing(self):
+        if self.scan_app:
+            self.scan_app.shutdown()
+        self.root.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = UnifiedTyremateApp(root)
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_alerts import HIGH_TEMPERATURE, LOW_PRESSURE, PRESSURE_DROP, AlertEngine  # noqa: E402
+from tyremate_decode import Reading  # noqa: E402
+
+BASE = 1750000000.0
+
+
+def reading(at, pressure=32.0, temperature=25, voltage=3.0, sensor_id="CD01"):
+    return Reading(sensor_id, pressure, temperature, voltage, b"\xa0", BASE + at)
+
+
+def engine(**config):
+    alerts = []
+    return AlertEngine.from_config(config, on_alert=alerts.append), alerts
+
+
+def test_raises_only_after_debounce_readings_in_a_row():
+    alerts_engine, alerts = engine(alert_debounce=3, alert_pressure_drop=0)
+    alerts_engine.update(reading(0, pressure=20.0))
+    alerts_engine.update(reading(1, pressure=20.0))
+    # One good frame resets the streak
+    alerts_engine.update(reading(2, pressure=30.0))
+    alerts_engine.update(reading(3, pressure=20.0))
+    alerts_engine.update(reading(4, pressure=20.0))
+    assert alerts == []
+    alerts_engine.update(reading(5, pressure=20.0))
+    assert [(a.rule.name, a.raised, a.value) for a in alerts] == [(LOW_PRESSURE, True, 20.0)]
+    assert alerts_engine.stats()["raised"][LOW_PRESSURE] == 1
+    assert [(sensor_id, rule.name) for sensor_id, rule in alerts_engine.active()] == [("CD01", LOW_PRESSURE)]
+
+
+def test_clears_only_after_debounce_good_readings():
+    alerts_engine, alerts = engine(alert_debounce=2)
+    for at in range(2):
+        alerts_engine.update(reading(at, temperature=90))
+    alerts_engine.update(reading(2, temperature=30))
+    alerts_engine.update(reading(3, temperature=90))
+    alerts_engine.update(reading(4, temperature=30))
+    assert [a.raised for a in alerts] == [True]
+    alerts_engine.update(reading(5, temperature=30))
+    assert [(a.rule.name, a.raised) for a in alerts] == [(HIGH_TEMPERATURE, True), (HIGH_TEMPERATURE, False)]
+    assert alerts_engine.active() == []
+    assert "cleared" in alerts[-1].message()
+
+
+def test_sensors_are_tracked_apart():
+    alerts_engine, alerts = engine(alert_debounce=2)
+    alerts_engine.update(reading(0, pressure=20.0, sensor_id="CD01"))
+    alerts_engine.update(reading(1, pressure=20.0, sensor_id="39F4"))
+    assert alerts == []
+    alerts_engine.update(reading(2, pressure=20.0, sensor_id="39F4"))
+    assert [a.sensor_id for a in alerts] == ["39F4"]
+
+
+def test_pressure_drop_within_the_window():
+    alerts_engine, alerts = engine(alert_debounce=1, alert_pressure_drop=3.0, alert_drop_window=300)
+    alerts_engine.update(reading(0, pressure=36.0))
+    alerts_engine.update(reading(60, pressure=34.0))
+    assert alerts == []
+    alerts_engine.update(reading(120, pressure=32.5))
+    assert [(a.rule.name, a.raised, a.value) for a in alerts] == [(PRESSURE_DROP, True, 3.5)]
+    # Once the 36 PSI reading has aged out of the window the drop is measured from 34
+    alerts_engine.update(reading(330, pressure=32.5))
+    assert [(a.rule.name, a.raised) for a in alerts][-1] == (PRESSURE_DROP, False)
+
+
+def test_slow_leak_over_a_longer_span_is_not_a_drop():
+    alerts_engine, alerts = engine(alert_debounce=1, alert_pressure_drop=3.0, alert_drop_window=300)
+    for step in range(20):
+        alerts_engine.update(reading(step * 100, pressure=36.0 - step * 0.5))
+    assert [a.rule.name for a in alerts] == []
+
+
+def test_zero_threshold_disables_a_rule():
+    alerts_engine, alerts = engine(alert_debounce=1, alert_low_pressure=0)
+    alerts_engine.update(reading(0, pressure=5.0))
+    assert LOW_PRESSURE not in alerts_engine.stats()["raised"]
+    assert alerts == []
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_db import BatchWriter, SQLiteManager, insert_reading_query, migrate_schema  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "readings.sqlite"))
+    migrate_schema(manager, None)
+    return manager
+
+
+def row(i, sensor_id="CD01"):
+    return (datetime(2025, 6, 18, 12, 0, i % 60), sensor_id, 32.0, 25, 3.0, "A0", "", f"test-{i:x}")
+
+
+def stored(manager):
+    with manager.connection() as conn:
+        return [r[0] for r in conn.execute("SELECT ingest_id FROM sensor_readings ORDER BY id")]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_flushes_when_the_batch_is_full(manager):
+    flushed = []
+    writer = BatchWriter(manager, insert_reading_query("sqlite"), batch_size=5, flush_interval=30.0,
+                         on_flush=lambda rows, at: flushed.append(len(rows)))
+    writer.start()
+    try:
+        for i in range(4):
+            writer.add(row(i))
+        time.sleep(0.1)
+        assert writer.rows_written == 0
+        writer.add(row(4))
+        assert wait_for(lambda: writer.rows_written == 5)
+    finally:
+        writer.close()
+    assert flushed == [5]
+    assert stored(manager) == [f"test-{i:x}" for i in range(5)]
+
+
+def test_flushes_a_partial_batch_after_the_interval(manager):
+    writer = BatchWriter(manager, insert_reading_query("sqlite"), batch_size=1000, flush_interval=0.2)
+    writer.start()
+    try:
+        for i in range(3):
+            writer.add(row(i))
+        assert writer.rows_written == 0
+        assert wait_for(lambda: writer.rows_written == 3)
+        assert writer.pending() == 0
+        assert writer.flushes == 1
+    finally:
+        writer.close()
+
+
+def test_close_flushes_what_is_left(manager):
+    writer = BatchWriter(manager, insert_reading_query("sqlite"), batch_size=1000, flush_interval=30.0)
+    writer.start()
+    for i in range(7):
+        writer.add(row(i))
+    writer.close()
+    assert len(stored(manager)) == 7
+
+
+def test_refused_rows_are_set_aside_and_the_rest_committed(manager):
+    with manager.connection() as conn:
+        conn.execute("CREATE TRIGGER refuse BEFORE INSERT ON sensor_readings WHEN NEW.sensor_id = 'BAD' "
+                     "BEGIN SELECT RAISE(ABORT, 'refused'); END")
+        conn.commit()
+    rejected, flushed, failed = [], [], []
+    writer = BatchWriter(manager, insert_reading_query("sqlite"), on_rejected=rejected.extend,
+                         on_flush=lambda rows, at: flushed.extend(rows), on_failed=failed.extend)
+    for i in range(5):
+        writer.add(row(i, "BAD" if i == 2 else "CD01"))
+    assert writer.flush() == 4
+    assert [r[0][7] for r in rejected] == ["test-2"]
+    assert [r[7] for r in flushed] == ["test-0", "test-1", "test-3", "test-4"]
+    assert failed == []
+    assert writer.rows_rejected == 1
+    assert stored(manager) == ["test-0", "test-1", "test-3", "test-4"]
+
+
+def test_unreachable_database_hands_the_batch_back(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "missing" / "readings.sqlite"))
+    errors, failed = [], []
+    writer = BatchWriter(manager, insert_reading_query("sqlite"),
+                         on_error=lambda e, count: errors.append(count), on_failed=failed.extend)
+    batch = [row(i) for i in range(3)]
+    for r in batch:
+        writer.add(r)
+    assert writer.flush() == 0
+    assert errors == [3]
+    assert failed == batch
+    assert writer.rows_failed == 3
+    assert writer.rows_rejected == 0
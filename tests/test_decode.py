@@ -0,0 +1,59 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_decode import FRAME_SIZE, unpack_frame, unpack_frames  # noqa: E402
+
+
+def reference_decode(data):
+    # The decoder as it was before unpack_frame: both fast paths must stay bit-for-bit equal to it
+    if len(data) < 10:
+        return {}
+    pressure_raw = int.from_bytes([data[5], data[6]], byteorder='big')
+    temp_raw = data[7]
+    voltage_raw = data[8]
+    return {
+        "Sensor ID": f"{data[1]:02X}{data[2]:02X}",
+        "Pressure (PSI)": round((pressure_raw / 6.895) - 15, 2),
+        "Temperature (°C)": temp_raw - 52,
+        "Voltage (V)": round((voltage_raw + 150) / 100, 3),
+        "Raw Data": data.hex().upper()
+    }
+
+
+def sample_frames(count=20000, seed=7):
+    rng = random.Random(seed)
+    frames = [bytes(rng.getrandbits(8) for _ in range(FRAME_SIZE)) for _ in range(count)]
+    # Every raw pressure and voltage value, so no rounding edge is left to chance
+    for raw in range(65536):
+        frames.append(bytes([0xA0, raw >> 8, raw & 0xFF, 0, 0, raw >> 8, raw & 0xFF, raw & 0xFF, raw & 0xFF])
+                      + bytes(FRAME_SIZE - 9))
+    return frames
+
+
+def test_unpack_frame_matches_reference():
+    for frame in sample_frames():
+        assert unpack_frame(frame, 0.0).as_dict() == reference_decode(frame)
+
+
+def test_short_frames_are_not_decoded():
+    for length in range(10):
+        assert unpack_frame(bytes(length)) is None
+        assert reference_decode(bytes(length)) == {}
+
+
+def test_unpack_frames_matches_reference():
+    pytest.importorskip("numpy")
+    frames = sample_frames()
+    decoded = unpack_frames(frames)
+    for i, frame in enumerate(frames):
+        expected = reference_decode(frame)
+        assert decoded["header"][i] == frame[0]
+        assert f"{decoded['sensor_id'][i]:04X}" == expected["Sensor ID"]
+        assert decoded["pressure"][i] == expected["Pressure (PSI)"]
+        assert decoded["temperature"][i] == expected["Temperature (°C)"]
+        assert decoded["voltage"][i] == expected["Voltage (V)"]
@@ -0,0 +1,100 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_decode import unpack_frame  # noqa: E402
+from tyremate_filters import DuplicateFilter, FrameValidator  # noqa: E402
+from tyremate_replay import load_log_frames  # noqa: E402
+
+SAMPLE_CAPTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "sample_capture.txt")
+
+
+def frame(sensor=0xCD01, pressure_raw=320, temp_raw=77, voltage_raw=150, header=0xA0):
+    # header, sensor id, 2 unused bytes, pressure (big-endian), temperature, voltage, padding to 20 bytes
+    return bytes([header, sensor >> 8, sensor & 0xFF, 0, 0, pressure_raw >> 8, pressure_raw & 0xFF,
+                  temp_raw, voltage_raw]) + bytes(11)
+
+
+def test_repeat_inside_the_window_is_suppressed():
+    dedup = DuplicateFilter(window=1.0)
+    assert not dedup.is_duplicate(frame(), 100.0)
+    assert dedup.is_duplicate(frame(), 100.5)
+    assert dedup.is_duplicate(frame(), 101.0)
+    assert dedup.passed == 1
+    assert dedup.stats()["by_sensor"] == {"CD01": 2}
+
+
+def test_repeat_after_the_window_passes():
+    dedup = DuplicateFilter(window=1.0)
+    assert not dedup.is_duplicate(frame(), 100.0)
+    assert not dedup.is_duplicate(frame(), 101.5)
+    assert dedup.total_suppressed() == 0
+
+
+def test_changed_payload_and_other_sensors_pass():
+    dedup = DuplicateFilter(window=1.0)
+    assert not dedup.is_duplicate(frame(), 100.0)
+    assert not dedup.is_duplicate(frame(pressure_raw=321), 100.1)
+    assert not dedup.is_duplicate(frame(sensor=0x39F4), 100.2)
+    # A frame that alternates with another is still caught while it sits in the sensor's ring
+    assert dedup.is_duplicate(frame(), 100.3)
+
+
+def test_ring_only_remembers_the_last_frames_per_sensor():
+    dedup = DuplicateFilter(window=10.0, ring_size=2)
+    for pressure_raw in (320, 321, 322):
+        assert not dedup.is_duplicate(frame(pressure_raw=pressure_raw), 100.0)
+    assert not dedup.is_duplicate(frame(pressure_raw=320), 100.1)
+    assert dedup.is_duplicate(frame(pressure_raw=322), 100.1)
+
+
+def test_zero_window_disables_suppression():
+    dedup = DuplicateFilter(window=0)
+    assert not dedup.is_duplicate(frame(), 100.0)
+    assert not dedup.is_duplicate(frame(), 100.0)
+    assert dedup.passed == 2
+    assert dedup.recent == {}
+
+
+def validate(validator, data, received_at=100.0):
+    return validator.check_frame(data, received_at) and validator.check_reading(unpack_frame(data, received_at))
+
+
+def test_validator_reject_reasons():
+    rejects = []
+    validator = FrameValidator(on_reject=lambda reason, data, at: rejects.append(reason))
+    assert validate(validator, frame())
+    assert not validate(validator, frame()[:9])
+    assert not validate(validator, frame(header=0xB1))
+    # A zeroed field decodes to -15 PSI, -52 °C or 1.5 V
+    assert not validate(validator, frame(pressure_raw=0))
+    assert not validate(validator, frame(temp_raw=0))
+    assert not validate(validator, frame(voltage_raw=0))
+    assert rejects == ["short_frame", "bad_header", "pressure_range", "temperature_range", "voltage_range"]
+    assert validator.stats() == {"passed": 1, "rejected": 5, "by_reason": {reason: 1 for reason in rejects}}
+    assert validator.summary().startswith("🚫 5 rejected")
+
+
+def test_validator_from_config():
+    validator = FrameValidator.from_config({"frame_header": "B1", "valid_pressure": [0, 20]})
+    assert not validate(validator, frame())
+    assert validate(validator, frame(header=0xB1, pressure_raw=200))
+    # Only frames too short to decode are turned away when validation is off
+    validator = FrameValidator.from_config({"validate_frames": False})
+    assert validate(validator, frame(header=0x00, pressure_raw=0, temp_raw=0, voltage_raw=0))
+    assert not validate(validator, frame()[:9])
+
+
+def test_accepts_does_not_count():
+    validator = FrameValidator()
+    assert validator.accepts(frame())
+    assert not validator.accepts(frame(voltage_raw=0))
+    assert not validator.accepts(frame()[:5])
+    assert validator.stats()["passed"] == 0 and validator.total_rejected() == 0
+
+
+def test_sample_capture_passes_the_default_validator():
+    frames = load_log_frames(SAMPLE_CAPTURE)
+    assert frames
+    assert all(FrameValidator().accepts(data) for data in frames)
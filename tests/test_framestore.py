@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_framestore import RECORD, FrameStore  # noqa: E402
+
+BASE = 1750000000.0
+
+
+def frame(sensor, pressure_raw=320):
+    return bytes([0xA0, sensor >> 8, sensor & 0xFF, 0, 0, pressure_raw >> 8, pressure_raw & 0xFF, 77, 150]) + bytes(11)
+
+
+def fill(store, count, sensors=(0xCD01, 0x39F4)):
+    for i in range(count):
+        store.append(BASE + i, frame(sensors[i % len(sensors)], 300 + i))
+
+
+def test_scan_filters_by_time_and_sensor(tmp_path):
+    store = FrameStore(str(tmp_path))
+    fill(store, 100)
+    got = list(store.scan(BASE + 10, BASE + 19, "CD01"))
+    assert [t for t, _ in got] == [BASE + i for i in range(10, 20, 2)]
+    assert all(f[1:3] == b"\xcd\x01" for _, f in got)
+    assert store.count() == 100
+    assert store.count(sensor_id="39F4") == 50
+    assert store.count(BASE + 90) == 10
+    store.close()
+
+
+def test_segments_roll_over_and_reopen_on_the_last_one(tmp_path):
+    store = FrameStore(str(tmp_path), segment_records=40)
+    fill(store, 100)
+    store.close()
+    assert [os.path.basename(p) for p in store.segment_paths()] == [
+        "segment-000001.bin", "segment-000002.bin", "segment-000003.bin"]
+    store = FrameStore(str(tmp_path), segment_records=40)
+    store.append(BASE + 100, frame(0xCD01))
+    store.close()
+    assert len(store.segment_paths()) == 3
+    assert [store.load_index(p).count for p in store.segment_paths()] == [40, 40, 21]
+    assert store.count() == 101
+
+
+def test_missing_index_is_rebuilt_after_a_crash(tmp_path):
+    store = FrameStore(str(tmp_path), flush_interval=3600)
+    fill(store, 50)
+    # The process dies: the frames reached the file but the index was never written
+    store._file.flush()
+    [segment] = store.segment_paths()
+    assert not os.path.exists(store.index_path(segment))
+
+    reopened = FrameStore(str(tmp_path))
+    assert reopened.count() == 50
+    assert reopened.count(sensor_id="CD01") == 25
+    with open(reopened.index_path(segment)) as f:
+        assert json.load(f)["count"] == 50
+    reopened.append(BASE + 50, frame(0xCD01))
+    reopened.close()
+    assert FrameStore(str(tmp_path)).count() == 51
+
+
+def test_stale_or_corrupt_index_is_rebuilt(tmp_path):
+    store = FrameStore(str(tmp_path))
+    fill(store, 10)
+    store.close()
+    [segment] = store.segment_paths()
+    with open(segment, "ab") as f:
+        f.write(RECORD.pack(BASE + 10, frame(0x4A10)))
+    index = FrameStore(str(tmp_path)).load_index(segment)
+    assert index.count == 11
+    assert index.last_ts == BASE + 10
+    assert index.sensors["4A10"] == [1, BASE + 10, BASE + 10]
+
+    with open(store.index_path(segment), "w") as f:
+        f.write("{not json")
+    assert FrameStore(str(tmp_path)).count(sensor_id="4A10") == 1
+
+
+def test_view_indexes_across_segments(tmp_path):
+    store = FrameStore(str(tmp_path), segment_records=30)
+    fill(store, 70)
+    view = store.view()
+    try:
+        assert len(view) == 70
+        assert view[0] == frame(0xCD01, 300)
+        assert view[45] == frame(0x39F4, 345)
+        assert view[69] == frame(0x39F4, 369)
+    finally:
+        view.close()
+        store.close()
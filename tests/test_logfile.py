@@ -0,0 +1,117 @@
+import glob
+import gzip
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_logfile import LOG_HEADER, LogAppender, tail_lines, truncate_log  # noqa: E402
+
+LINE = "2025-06-18 12:00:00,CD01,32.0,25,3.0,A0CD01\n"
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def rotated(tmp_path, pattern="log.*.txt*"):
+    return sorted(glob.glob(str(tmp_path / pattern)))
+
+
+def test_new_file_starts_with_the_header(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, flush_interval=0.05)
+    appender.open()
+    appender.write(LINE)
+    appender.close()
+    assert read(path) == LOG_HEADER + LINE
+    # Reopening appends to what is there without a second header
+    appender = LogAppender(path)
+    appender.open()
+    appender.write(LINE)
+    appender.close()
+    assert read(path) == LOG_HEADER + LINE * 2
+
+
+def test_rotates_by_size(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, max_bytes=len(LOG_HEADER) + len(LINE) * 3, compress=False, backups=0)
+    for _ in range(7):
+        appender.write(LINE)
+    appender.close()
+    assert appender.rotations == 2
+    files = rotated(tmp_path)
+    assert len(files) == 2
+    for old in files:
+        assert read(old) == LOG_HEADER + LINE * 3
+    assert read(path) == LOG_HEADER + LINE
+
+
+def test_rotates_when_the_day_changes(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, max_bytes=0, compress=False)
+    appender.write(LINE)
+    appender._opened_on = date.today() - timedelta(days=1)
+    appender.write(LINE)
+    appender.close()
+    assert appender.rotations == 1
+    assert read(path) == LOG_HEADER + LINE
+
+
+def test_prunes_old_backups(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, max_bytes=len(LOG_HEADER) + len(LINE), compress=False, backups=2)
+    for _ in range(5):
+        appender.write(LINE)
+    appender.close()
+    assert appender.rotations == 4
+    assert len(rotated(tmp_path)) == 2
+
+
+def test_compresses_rotated_files(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, max_bytes=len(LOG_HEADER) + len(LINE), compress=True)
+    appender.write(LINE)
+    appender.write(LINE)
+    appender.close()
+    deadline = time.monotonic() + 2.0
+    while not rotated(tmp_path, "log.*.txt.gz") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    [packed] = rotated(tmp_path, "log.*.txt.gz")
+    assert rotated(tmp_path) == [packed]
+    with gzip.open(packed, "rt") as f:
+        assert f.read() == LOG_HEADER + LINE
+
+
+def test_truncate_goes_through_the_open_appender(tmp_path):
+    path = str(tmp_path / "log.txt")
+    appender = LogAppender(path, max_bytes=len(LOG_HEADER) + len(LINE) * 3, compress=False)
+    appender.open()
+    appender.write(LINE)
+    appender.write(LINE)
+    truncate_log(path)
+    assert read(path) == LOG_HEADER
+    assert appender.stats()["size"] == os.path.getsize(path)
+    appender.write(LINE)
+    appender.close()
+    # The size restarted from the header, so no rotation happened after the clear
+    assert appender.rotations == 0
+    assert read(path) == LOG_HEADER + LINE
+
+
+def test_truncate_without_an_appender(tmp_path):
+    path = str(tmp_path / "log.txt")
+    with open(path, "w") as f:
+        f.write(LOG_HEADER + LINE)
+    truncate_log(path)
+    assert read(path) == ""
+
+
+def test_tail_lines_reads_only_the_end(tmp_path):
+    path = str(tmp_path / "log.txt")
+    with open(path, "w") as f:
+        f.writelines(f"line {i}\n" for i in range(5000))
+    assert tail_lines(path, 3) == ["line 4997", "line 4998", "line 4999"]
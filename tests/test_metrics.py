@@ -0,0 +1,110 @@
+import json
+import os
+import socket
+import sys
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_metrics import (  # noqa: E402
+    BUCKETS, LatencyHistogram, Metrics, MetricsExporter, RateCounter, bucket_index, bucket_value,
+)
+
+
+def test_buckets_are_exact_below_128_us_and_close_above():
+    for value in range(128):
+        assert bucket_value(bucket_index(value)) == value
+    previous = 0
+    for value in range(128, 60_000_000, 997):
+        index = bucket_index(value)
+        assert index >= previous
+        previous = index
+        assert abs(bucket_value(index) - value) <= value * 0.016
+    assert bucket_index(10 ** 12) == BUCKETS - 1
+
+
+def test_percentiles_of_a_uniform_spread():
+    histogram = LatencyHistogram()
+    for us in range(1, 10001):
+        histogram.record(us / 1_000_000)
+    summary = histogram.summary()
+    assert summary["count"] == 10000
+    assert summary["min_us"] == 1 and summary["max_us"] == 10000
+    assert summary["mean_us"] == pytest.approx(5000.5, rel=1e-4)
+    for key, expected in (("p50_us", 5000), ("p90_us", 9000), ("p99_us", 9900), ("p999_us", 9990)):
+        assert summary[key] == pytest.approx(expected, rel=0.016)
+
+
+def test_percentile_never_exceeds_the_max():
+    histogram = LatencyHistogram()
+    histogram.record(0.000200)
+    assert histogram.percentile(99) == 200
+    assert LatencyHistogram().percentile(50) == 0
+
+
+def test_rate_counts_the_last_complete_seconds():
+    rate = RateCounter()
+    rate.current_second = 100
+    for second in range(100, 105):
+        rate.mark(second + 0.5, 10)
+    assert rate.rate(105.1) == 10.0
+    # Three quiet seconds are averaged in
+    assert rate.rate(108.1) == pytest.approx(50 / 8)
+    assert rate.total == 50
+
+
+def test_prometheus_text_has_stages_sensors_and_counters():
+    metrics = Metrics()
+    metrics.observe("decode", 0.000050, sensor_id="CD01")
+    metrics.observe("decode", 0.000150)
+    metrics.count("rejected_frames", "reason", "bad_header")
+    metrics.count("rejected_frames", "reason", "bad_header")
+    metrics.count("rejected_frames", "reason", "db_rejected")
+    text = metrics.to_prometheus()
+    assert 'tyremate_stage_latency_seconds_count{stage="decode"} 2' in text
+    assert 'tyremate_stage_events_total{stage="decode"} 2' in text
+    assert 'tyremate_sensor_latency_seconds_count{sensor="CD01"} 1' in text
+    assert 'tyremate_rejected_frames_total{reason="bad_header"} 2' in text
+    assert 'tyremate_rejected_frames_total{reason="db_rejected"} 1' in text
+
+
+def test_timed_wraps_a_call_and_records_it():
+    metrics = Metrics()
+    calls = []
+    wrapped = metrics.timed("persist", calls.append)
+    wrapped("row")
+    assert calls == ["row"]
+    assert metrics.snapshot()["stages"]["persist"]["count"] == 1
+
+
+def test_exporter_writes_json_or_prometheus_files(tmp_path):
+    metrics = Metrics()
+    metrics.observe("qr", 0.001)
+    exporter = MetricsExporter(metrics, str(tmp_path / "metrics.json"))
+    exporter.export()
+    with open(tmp_path / "metrics.json") as f:
+        assert json.load(f)["stages"]["qr"]["count"] == 1
+    exporter = MetricsExporter(metrics, str(tmp_path / "metrics.prom"))
+    exporter.export()
+    with open(tmp_path / "metrics.prom") as f:
+        assert 'tyremate_stage_latency_seconds_count{stage="qr"} 1' in f.read()
+
+
+def test_exporter_serves_prometheus_and_reports_a_busy_port():
+    metrics = Metrics()
+    metrics.observe("ui", 0.002)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    exporter = MetricsExporter(metrics, port=port)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert 'tyremate_stage_events_total{stage="ui"} 1' in response.read().decode()
+        # The caller decides what a busy port means; the exporter only reports it
+        with pytest.raises(OSError):
+            MetricsExporter(metrics, port=port).start()
+    finally:
+        exporter.stop()
@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_pipeline import BLOCK, DROP_NEWEST, DROP_OLDEST, _STOP, IngestPipeline, PipelineStage  # noqa: E402
+
+
+def drain(stage):
+    items = []
+    while not stage.queue.empty():
+        items.append(stage.queue.get_nowait())
+    return items
+
+
+def test_unknown_policy_is_refused():
+    with pytest.raises(ValueError):
+        PipelineStage("x", None, drop_policy="later")
+
+
+def test_drop_oldest_keeps_the_newest_items():
+    stage = PipelineStage("x", None, maxsize=3, drop_policy=DROP_OLDEST)
+    results = [stage.put(i) for i in range(5)]
+    assert results == [True] * 5
+    assert drain(stage) == [2, 3, 4]
+    assert stage.dropped == 2
+    assert stage.enqueued == 5
+    assert stage.high_water == 3
+
+
+def test_drop_newest_keeps_the_oldest_items():
+    stage = PipelineStage("x", None, maxsize=3, drop_policy=DROP_NEWEST)
+    results = [stage.put(i) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert drain(stage) == [0, 1, 2]
+    assert stage.dropped == 2
+    assert stage.enqueued == 3
+
+
+def test_block_waits_for_room():
+    stage = PipelineStage("x", None, maxsize=1, drop_policy=BLOCK, block_timeout=2.0)
+    stage.put(0)
+    threading.Timer(0.05, stage.queue.get).start()
+    started = time.perf_counter()
+    assert stage.put(1)
+    assert time.perf_counter() - started >= 0.04
+    assert drain(stage) == [1]
+    assert stage.dropped == 0
+
+
+def test_block_gives_up_after_its_timeout():
+    stage = PipelineStage("x", None, maxsize=1, drop_policy=BLOCK, block_timeout=0.05)
+    stage.put(0)
+    assert not stage.put(1)
+    assert stage.dropped == 1
+    assert drain(stage) == [0]
+
+
+def test_block_without_timeout_never_waits():
+    stage = PipelineStage("x", None, maxsize=1, drop_policy=BLOCK, block_timeout=0)
+    stage.put(0)
+    started = time.perf_counter()
+    assert not stage.put(1)
+    assert time.perf_counter() - started < 0.05
+    assert stage.dropped == 1
+
+
+def test_drop_oldest_never_evicts_the_stop_sentinel():
+    stage = PipelineStage("x", None, maxsize=1, drop_policy=DROP_OLDEST)
+    stage.queue.put(_STOP)
+    assert not stage.put(1)
+    assert drain(stage) == [_STOP]
+
+
+def test_stop_drains_pending_items():
+    handled = []
+    stage = PipelineStage("x", handled.append, maxsize=100)
+    for i in range(50):
+        stage.put(i)
+    stage.start()
+    stage.stop(timeout=2.0)
+    assert handled == list(range(50))
+    assert stage.processed == 50
+
+
+def test_pipeline_fans_out_decoded_items():
+    persisted, rendered, shown = [], [], []
+    pipeline = IngestPipeline(
+        lambda item: item[1].hex(), persisted.append, rendered.append, shown.append, drop_policy=BLOCK
+    )
+    pipeline.start()
+    for i in range(10):
+        assert pipeline.submit(bytearray([i]))
+    pipeline.decode_stage.stop()
+    pipeline.persist_stage.stop()
+    pipeline.qr_stage.stop()
+    pipeline.ui_stage.stop()
+    expected = [f"{i:02x}" for i in range(10)]
+    assert persisted == rendered == shown == expected
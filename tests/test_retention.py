@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_db import SQLiteManager, migrate_schema, rollup_upsert_query  # noqa: E402
+from tyremate_queries import ReadingQueries  # noqa: E402
+from tyremate_retention import Retention  # noqa: E402
+
+NOW = datetime(2025, 6, 18, 12)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "readings.sqlite"))
+    migrate_schema(manager, None)
+    return manager
+
+
+def insert(manager, stamps):
+    with manager.connection() as conn:
+        conn.executemany(
+            "INSERT INTO sensor_readings (timestamp, sensor_id, pressure_psi, temperature, voltage) VALUES (?, 'CD01', 32.0, 25, 3.0)",
+            [(stamp,) for stamp in stamps],
+        )
+        conn.commit()
+
+
+def ids(manager):
+    with manager.connection() as conn:
+        return [r[0] for r in conn.execute("SELECT id FROM sensor_readings ORDER BY id")]
+
+
+def test_delete_before_walks_the_ids_in_chunks(manager):
+    # Every third row is old, as a replayed spool leaves them: ids and timestamps do not line up
+    insert(manager, [NOW - timedelta(days=40 if i % 3 == 0 else 1) for i in range(20)])
+    progress = []
+    deleted = ReadingQueries(manager, None).delete_before(NOW - timedelta(days=30), chunk=4, on_chunk=progress.append)
+    assert deleted == 7
+    assert progress == sorted(progress) and progress[-1] == 7 and len(progress) > 1
+    assert ids(manager) == [i + 1 for i in range(20) if i % 3]
+
+
+def test_delete_before_with_nothing_expired(manager):
+    insert(manager, [NOW] * 5)
+    assert ReadingQueries(manager, None).delete_before(NOW - timedelta(days=1), chunk=2) == 0
+    assert len(ids(manager)) == 5
+
+
+def test_delete_oldest_keeps_the_newest_rows(manager):
+    insert(manager, [NOW] * 23)
+    progress = []
+    deleted = ReadingQueries(manager, None).delete_oldest(5, chunk=4, on_chunk=progress.append)
+    assert deleted == 18
+    assert progress == [4, 8, 12, 16, 18]
+    assert ids(manager) == list(range(19, 24))
+    assert ReadingQueries(manager, None).delete_oldest(5) == 0
+
+
+def test_enforce_applies_age_and_row_limits(manager):
+    now = datetime.now()
+    insert(manager, [now - timedelta(days=10)] * 4 + [now] * 6)
+    retention = Retention(manager, None, chunk=3)
+    retention.row_days = 7
+    retention.max_rows = 4
+    assert retention.enforce() == (6, 0, 0)
+    assert ids(manager) == [7, 8, 9, 10]
+
+
+def test_clear_keeps_rollups_unless_asked(manager):
+    insert(manager, [NOW] * 3)
+    with manager.connection() as conn:
+        conn.execute(rollup_upsert_query("sqlite").replace("%s", "?"),
+                     ("CD01", 3600, NOW, 3, 30.0, 34.0, 96.0, 25, 25, 75, 3.0, 3.0, 9.0))
+        conn.commit()
+    queries = ReadingQueries(manager, None)
+    Retention(manager, None).clear_rows()
+    assert queries.count() == 0
+    assert len(queries.rollups(3600)) == 1
+    Retention(manager, None).clear_rows(derived=True)
+    assert queries.rollups(3600) == []
+
+
+def test_purge_files_by_age_then_size(manager, tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"qr_{i}.png"
+        path.write_bytes(b"x" * 1024)
+        # qr_0 is the oldest
+        os.utime(path, (time.time() - (5 - i) * 86400,) * 2)
+        paths.append(str(path))
+    retention = Retention(manager, None, qr_dir=str(tmp_path))
+    assert retention.purge_files(paths, max_age_days=3.5) == 2
+    assert retention.purge_files(retention.qr_files(), max_mb=2 / 1024) == 1
+    assert sorted(os.path.basename(p) for p in retention.qr_files()) == ["qr_3.png", "qr_4.png"]
@@ -0,0 +1,148 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_db import SQLiteManager, migrate_schema, rollup_upsert_query  # noqa: E402
+from tyremate_decode import Reading  # noqa: E402
+from tyremate_queries import ReadingQueries, merge_open_buckets  # noqa: E402
+from tyremate_rollup import HOUR, MINUTE, RollupEngine, pick_resolution  # noqa: E402
+
+# 2025-06-18 12:00:00 local time, so bucket starts line up with whole hours whatever the timezone
+BASE = datetime(2025, 6, 18, 12).timestamp()
+
+
+def reading(at, pressure, sensor_id="CD01", temperature=25, voltage=3.0):
+    return Reading(sensor_id, pressure, temperature, voltage, b"\xa0", BASE + at)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "readings.sqlite"))
+    migrate_schema(manager, None)
+    return manager
+
+
+def write_rollups(manager, rows):
+    with manager.connection() as conn:
+        conn.executemany(rollup_upsert_query("sqlite").replace("%s", "?"), rows)
+        conn.commit()
+
+
+def test_engine_closes_buckets_as_time_moves_on():
+    closed = []
+    engine = RollupEngine(closed.append, (MINUTE, HOUR))
+    for at, pressure in ((0, 30.0), (10, 34.0), (59, 32.0), (60, 31.0)):
+        engine.add(reading(at, pressure))
+    # Only the first minute has closed; the hour and the second minute are still open
+    assert len(closed) == 1
+    sensor_id, resolution, start, count, p_min, p_max, p_sum = closed[0][:7]
+    assert (sensor_id, resolution, start, count) == ("CD01", MINUTE, datetime.fromtimestamp(BASE), 3)
+    assert (p_min, p_max, p_sum) == (30.0, 34.0, 96.0)
+    assert sorted(row[1] for row in engine.open_rows(MINUTE) + engine.open_rows(HOUR)) == [MINUTE, HOUR]
+    assert engine.open_rows(HOUR)[0][3] == 4
+
+
+def test_late_reading_is_handed_on_as_its_own_bucket():
+    closed = []
+    engine = RollupEngine(closed.append, (MINUTE,))
+    engine.add(reading(120, 30.0))
+    engine.add(reading(5, 40.0))
+    assert engine.late == 1
+    assert closed[0][2] == datetime.fromtimestamp(BASE) and closed[0][3] == 1
+
+
+def test_upsert_merges_a_bucket_written_twice(manager):
+    # A bucket flushed at shutdown and continued after a restart adds up instead of overwriting
+    first, second = [], []
+    engine = RollupEngine(first.append, (HOUR,))
+    engine.add(reading(0, 30.0))
+    engine.add(reading(10, 36.0))
+    engine.flush_open()
+    engine = RollupEngine(second.append, (HOUR,))
+    engine.add(reading(20, 28.0))
+    engine.flush_open()
+    write_rollups(manager, first + second)
+    rows = ReadingQueries(manager, None).rollups(HOUR)
+    assert len(rows) == 1
+    assert rows[0][2:6] == (3, 28.0, 36.0, pytest.approx(94.0 / 3))
+
+
+def test_history_merges_open_buckets_with_written_ones(manager):
+    written = []
+    engine = RollupEngine(written.append, (MINUTE, HOUR))
+    # Hour 12 closes when hour 13 starts; hour 13 is written at a restart, then a new session continues it
+    engine.add(reading(0, 30.0))
+    engine.add(reading(3600, 32.0))
+    engine.flush_open()
+    write_rollups(manager, written)
+    engine = RollupEngine(written.append, (MINUTE, HOUR))
+    engine.add(reading(3610, 36.0, temperature=35))
+    engine.add(reading(3620, 40.0, sensor_id="39F4"))
+
+    queries = ReadingQueries(manager, None)
+    start, end = datetime.fromtimestamp(BASE), datetime.fromtimestamp(BASE + 10 * 86400)
+    resolution, rows = queries.history("CD01", start, end, open_buckets=engine.open_rows)
+    assert resolution == HOUR
+    assert [(row[0], row[1], row[2]) for row in rows] == [
+        ("CD01", datetime.fromtimestamp(BASE), 1),
+        ("CD01", datetime.fromtimestamp(BASE + 3600), 2),
+    ]
+    merged = rows[1]
+    assert merged[3:6] == (32.0, 36.0, 34.0)
+    assert merged[6:9] == (25.0, 35.0, 30.0)
+
+    # Without a sensor filter the open bucket of a sensor never written before shows up on its own
+    _, rows = queries.history(None, start, end, open_buckets=engine.open_rows)
+    assert [(row[0], row[2]) for row in rows] == [("39F4", 1), ("CD01", 1), ("CD01", 2)]
+
+    # The same span without open buckets only has what was written
+    _, rows = queries.history("CD01", start, end)
+    assert [row[2] for row in rows] == [1, 1]
+
+
+def test_short_history_reads_raw_rows(manager):
+    with manager.connection() as conn:
+        conn.executemany(
+            "INSERT INTO sensor_readings (timestamp, sensor_id, pressure_psi, temperature, voltage) VALUES (?, ?, ?, ?, ?)",
+            [(datetime.fromtimestamp(BASE + i), "CD01", 30.0 + i, 25, 3.0) for i in range(3)],
+        )
+        conn.commit()
+    start = datetime.fromtimestamp(BASE)
+    resolution, rows = ReadingQueries(manager, None).history("CD01", start, datetime.fromtimestamp(BASE + 600))
+    assert resolution == 0
+    assert [row[3] for row in rows] == [30.0, 31.0, 32.0]
+
+
+def test_idle_buckets_close_once_their_span_is_over():
+    closed = []
+    engine = RollupEngine(closed.append, (MINUTE, HOUR))
+    engine.add(reading(5, 30.0))
+    assert engine.close_idle(BASE + 59) == 0
+    assert engine.close_idle(BASE + 60) == 1
+    assert [row[1] for row in closed] == [MINUTE]
+    assert engine.close_idle(BASE + 3600) == 1
+    assert engine.stats()["open_buckets"] == 0
+
+
+def test_open_buckets_outside_the_range_are_left_out():
+    engine = RollupEngine(lambda row: None, (MINUTE,))
+    for at in (0, 60, 120):
+        engine.add(reading(at, 30.0 + at / 60))
+    start, end = datetime.fromtimestamp(BASE + 60), datetime.fromtimestamp(BASE + 60)
+    rows = merge_open_buckets([], engine.open_rows(MINUTE), "CD01", start, end)
+    assert rows == []
+    # Each minute closed the one before it, so only the last one is still open
+    rows = merge_open_buckets([], engine.open_rows(MINUTE), "CD01", start, datetime.fromtimestamp(BASE + 120))
+    assert [(row[1], row[2], row[5]) for row in rows] == [(datetime.fromtimestamp(BASE + 120), 1, 32.0)]
+
+
+def test_pick_resolution_keeps_under_max_points():
+    start = datetime.fromtimestamp(BASE)
+    assert pick_resolution(start, datetime.fromtimestamp(BASE + 86400)) == MINUTE
+    assert pick_resolution(start, datetime.fromtimestamp(BASE + 30 * 86400)) == HOUR
+    # Past what the coarsest rollup can fit, the coarsest one is still used
+    assert pick_resolution(start, datetime.fromtimestamp(BASE + 365 * 86400)) == HOUR
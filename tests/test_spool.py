@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tyremate_db import SQLiteManager, migrate_schema  # noqa: E402
+from tyremate_spool import Spool  # noqa: E402
+
+
+def row(i, sensor_id="CD01"):
+    return (datetime(2025, 6, 18, 12, 0, i % 60), sensor_id, 32.0, 25, 3.0, "A0", "", f"spool-{i:x}")
+
+
+def stored(manager):
+    with manager.connection() as conn:
+        return [r[0] for r in conn.execute("SELECT ingest_id FROM sensor_readings ORDER BY id")]
+
+
+@pytest.fixture
+def target(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "target.sqlite"))
+    migrate_schema(manager, None)
+    return manager
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = Spool(str(tmp_path / "spool.sqlite"))
+    yield spool
+    spool.close()
+
+
+def test_replay_moves_rows_to_the_target_in_order(spool, target):
+    spool.add_many([row(i) for i in range(12)])
+    assert spool.pending() == 12
+    assert spool.replay(target, None, chunk=5) == 12
+    assert stored(target) == [f"spool-{i:x}" for i in range(12)]
+    assert spool.pending() == 0
+    assert stored(spool.manager) == []
+    assert spool.replay(target, None) == 0
+
+
+def test_replay_after_an_interrupted_replay_inserts_once(spool, target):
+    rows = [row(i) for i in range(5)]
+    spool.add_many(rows)
+    spool.replay(target, None)
+    # As if the last replay died after the target committed but before the spool deleted its rows
+    spool.add_many(rows + [row(5)])
+    spool.replay(target, None)
+    assert stored(target) == [f"spool-{i:x}" for i in range(6)]
+    assert spool.pending() == 0
+
+
+def test_refused_rows_leave_the_spool_and_are_reported(tmp_path, target):
+    with target.connection() as conn:
+        conn.execute("CREATE TRIGGER refuse BEFORE INSERT ON sensor_readings WHEN NEW.sensor_id = 'BAD' "
+                     "BEGIN SELECT RAISE(ABORT, 'refused'); END")
+        conn.commit()
+    rejected = []
+    spool = Spool(str(tmp_path / "spool.sqlite"), on_rejected=rejected.extend)
+    try:
+        spool.add_many([row(0), row(1, "BAD"), row(2)])
+        assert spool.replay(target, None) == 2
+        assert [r[0][7] for r in rejected] == ["spool-1"]
+        assert spool.stats()["rejected"] == 1
+        assert spool.pending() == 0
+        assert stored(spool.manager) == []
+        assert stored(target) == ["spool-0", "spool-2"]
+    finally:
+        spool.close()
+
+
+def test_unreachable_target_keeps_the_rows(spool, tmp_path):
+    spool.add_many([row(i) for i in range(3)])
+    with pytest.raises(sqlite3.OperationalError):
+        spool.replay(SQLiteManager(str(tmp_path / "missing" / "target.sqlite")), None)
+    assert spool.pending() == 3
+    assert len(stored(spool.manager)) == 3
+
+
+def test_pending_survives_a_restart(tmp_path, target):
+    path = str(tmp_path / "spool.sqlite")
+    spool = Spool(path)
+    for i in range(4):
+        spool.add(row(i))
+    spool.close()
+    spool = Spool(path)
+    try:
+        assert spool.pending() == 4
+        assert spool.replay(target, None) == 4
+    finally:
+        spool.close()
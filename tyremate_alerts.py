@@ -0,0 +1,180 @@
+import threading
+from datetime import datetime
+
+LOW_PRESSURE = "low_pressure"
+PRESSURE_DROP = "pressure_drop"
+HIGH_TEMPERATURE = "high_temperature"
+LOW_VOLTAGE = "low_voltage"
+DEFAULT_DEBOUNCE = 3
+DROP_WINDOW = 300.0
+# The drop window is kept as this many per-slot pressure maxima, whatever the reading rate
+WINDOW_SLOTS = 10
+
+
+class Rule:
+    __slots__ = ("name", "label", "threshold", "unit", "above")
+
+    def __init__(self, name, label, threshold, unit, above):
+        self.name = name
+        self.label = label
+        self.threshold = threshold
+        self.unit = unit
+        # above=True fires when the measured value exceeds the threshold, otherwise when it falls below it
+        self.above = above
+
+    def breached(self, value):
+        return value > self.threshold if self.above else value < self.threshold
+
+
+class Alert:
+    __slots__ = ("sensor_id", "rule", "raised", "value", "at")
+
+    def __init__(self, sensor_id, rule, raised, value, at):
+        self.sensor_id = sensor_id
+        self.rule = rule
+        self.raised = raised
+        self.value = value
+        self.at = at
+
+    def message(self):
+        rule = self.rule
+        if self.raised:
+            return (f"⚠️ Sensor {self.sensor_id}: {rule.label} {self.value:g} {rule.unit} "
+                    f"(limit {rule.threshold:g} {rule.unit})")
+        return f"✅ Sensor {self.sensor_id}: {rule.label} cleared at {self.value:g} {rule.unit}"
+
+    def row(self):
+        # Same order as tyremate_db.ALERT_COLUMNS
+        return (self.sensor_id, self.rule.name, "raised" if self.raised else "cleared",
+                self.value, self.rule.threshold, datetime.fromtimestamp(self.at))
+
+
+class SensorState:
+    __slots__ = ("sensor_id", "pressure", "temperature", "voltage", "last_seen", "readings",
+                 "slot", "slot_max", "streaks", "active")
+
+    def __init__(self, sensor_id, rule_count):
+        self.sensor_id = sensor_id
+        self.pressure = None
+        self.temperature = None
+        self.voltage = None
+        self.last_seen = None
+        self.readings = 0
+        self.slot = None
+        self.slot_max = [None] * WINDOW_SLOTS
+        # Per rule: readings in a row that disagree with the current state, and whether it is raised
+        self.streaks = [0] * rule_count
+        self.active = [False] * rule_count
+
+    def window_max(self, pressure, received_at, slot_width):
+        # Coarse sliding window: the highest pressure seen per slot over the last WINDOW_SLOTS slots
+        slot = int(received_at // slot_width)
+        if self.slot is None or slot - self.slot >= WINDOW_SLOTS:
+            self.slot_max = [None] * WINDOW_SLOTS
+            self.slot = slot
+        elif slot > self.slot:
+            for skipped in range(self.slot + 1, slot + 1):
+                self.slot_max[skipped % WINDOW_SLOTS] = None
+            self.slot = slot
+        if slot == self.slot:
+            current = self.slot_max[slot % WINDOW_SLOTS]
+            if current is None or pressure > current:
+                self.slot_max[slot % WINDOW_SLOTS] = pressure
+        highest = pressure
+        for value in self.slot_max:
+            if value is not None and value > highest:
+                highest = value
+        return highest
+
+
+class AlertEngine:
+    def __init__(self, rules, on_alert=None, debounce=DEFAULT_DEBOUNCE, drop_window=DROP_WINDOW):
+        self.rules = tuple(rules)
+        self.on_alert = on_alert
+        self.debounce = max(1, int(debounce))
+        self.slot_width = drop_window / WINDOW_SLOTS
+        # sensor_id -> SensorState; fixed-size per sensor, so a reading costs the same after a year as after a minute
+        self.sensors = {}
+        self._lock = threading.Lock()
+
+        self.readings = 0
+        self.raised = {rule.name: 0 for rule in self.rules}
+
+    @classmethod
+    def from_config(cls, config, on_alert=None):
+        # 0 disables a rule
+        limits = (
+            (LOW_PRESSURE, "low pressure", float(config.get("alert_low_pressure", 25.0)), "PSI", False),
+            (PRESSURE_DROP, "pressure drop", float(config.get("alert_pressure_drop", 3.0)), "PSI", True),
+            (HIGH_TEMPERATURE, "over temperature", float(config.get("alert_high_temperature", 85.0)), "°C", True),
+            (LOW_VOLTAGE, "low battery", float(config.get("alert_low_voltage", 2.5)), "V", False),
+        )
+        return cls(
+            [Rule(*limit) for limit in limits if limit[2]],
+            on_alert,
+            debounce=int(config.get("alert_debounce", DEFAULT_DEBOUNCE)),
+            drop_window=float(config.get("alert_drop_window", DROP_WINDOW)),
+        )
+
+    def measure(self, rule, state, reading):
+        if rule.name == LOW_PRESSURE:
+            return reading.pressure
+        if rule.name == PRESSURE_DROP:
+            return round(state.window_max(reading.pressure, reading.received_at, self.slot_width) - reading.pressure, 2)
+        if rule.name == HIGH_TEMPERATURE:
+            return reading.temperature
+        return reading.voltage
+
+    def update(self, reading):
+        alerts = []
+        with self._lock:
+            self.readings += 1
+            state = self.sensors.get(reading.sensor_id)
+            if state is None:
+                state = self.sensors[reading.sensor_id] = SensorState(reading.sensor_id, len(self.rules))
+            state.pressure = reading.pressure
+            state.temperature = reading.temperature
+            state.voltage = reading.voltage
+            state.last_seen = reading.received_at
+            state.readings += 1
+            for i, rule in enumerate(self.rules):
+                value = self.measure(rule, state, reading)
+                # Debounced both ways: one odd frame neither raises an alert nor clears one
+                if rule.breached(value) == state.active[i]:
+                    state.streaks[i] = 0
+                    continue
+                state.streaks[i] += 1
+                if state.streaks[i] < self.debounce:
+                    continue
+                state.streaks[i] = 0
+                state.active[i] = not state.active[i]
+                if state.active[i]:
+                    self.raised[rule.name] += 1
+                alerts.append(Alert(reading.sensor_id, rule, state.active[i], value, reading.received_at))
+        if self.on_alert:
+            for alert in alerts:
+                self.on_alert(alert)
+        return alerts
+
+    def active(self):
+        with self._lock:
+            return [
+                (state.sensor_id, rule)
+                for state in self.sensors.values()
+                for rule, active in zip(self.rules, state.active)
+                if active
+            ]
+
+    def summary(self):
+        active = self.active()
+        if not active:
+            return f"✅ No active alerts ({len(self.sensors)} sensors watched)"
+        return f"⚠️ {len(active)} active: " + ", ".join(f"{sensor_id} {rule.label}" for sensor_id, rule in active)
+
+    def stats(self):
+        return {
+            "readings": self.readings,
+            "sensors": len(self.sensors),
+            "active": len(self.active()),
+            "raised": dict(self.raised),
+        }
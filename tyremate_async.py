@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BlockingExecutor:
+    # Runs blocking driver calls on its own threads so coroutines can await them with a timeout
+    def __init__(self, name="db", workers=1, timeout=10.0):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.timeout = timeout
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        future = loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+        try:
+            # On timeout the call keeps running on its thread; only the awaiting coroutine gives up
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.calls += 1
+            self.last_ms = (time.perf_counter() - started) * 1000
+            self.max_ms = max(self.max_ms, self.last_ms)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "last_ms": self.last_ms,
+            "max_ms": self.max_ms,
+        }
+
+
+class LoopLagMonitor:
+    def __init__(self, interval=0.1, window=600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.last = 0.0
+        self.max = 0.0
+        self.running = False
+
+    async def run(self):
+        # Anything that blocks the loop delays this wake-up; the overshoot is the lag
+        loop = asyncio.get_running_loop()
+        self.running = True
+        while self.running:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - expected)
+            self.max = max(self.max, self.last)
+            self.samples.append(self.last)
+
+    def stop(self):
+        self.running = False
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def stats(self):
+        return {
+            "last_ms": self.last * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return f"⏱️ Loop lag {s['last_ms']:.1f} ms (p99 {s['p99_ms']:.1f}, max {s['max_ms']:.1f})"
@@ -1,20 +1,37 @@
 import asyncio
-from bleak import BleakScanner, BleakClient
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import threading
+import time
+from collections import deque
 from datetime import datetime
-import mysql.connector
-import qrcode
-from PIL import Image, ImageTk
 import os
 import logging
 import json
+import uuid
+from itertools import count
+from tyremate_pipeline import IngestPipeline, DROP_OLDEST
+from tyremate_db import (
+    BatchWriter, alert_insert_query, get_manager, insert_reading_query, migrate_schema, rollup_upsert_query,
+)
+from tyremate_qr import QRRenderer, QR_DIR
+from tyremate_filters import DuplicateFilter, FrameValidator
+from tyremate_decode import unpack_frame
+from tyremate_replay import ReplaySource
+from tyremate_logfile import LogAppender, tail_lines
+from tyremate_framestore import FrameStore, FRAME_DIR
+from tyremate_rollup import RollupEngine, RESOLUTIONS
+from tyremate_async import BlockingExecutor, LoopLagMonitor
+from tyremate_spool import Spool, SPOOL_FILE
+from tyremate_retention import Retention
+from tyremate_metrics import Metrics, MetricsExporter
+from tyremate_alerts import AlertEngine
 
 TARGET_NAME = "Tyremate"
 WRITE_UUID = "2d86686a-53dc-25b3-0c4a-f0e10c8dee20"
 NOTIFY_UUID = "9e1547ba-c365-57b5-2947-c5e1c1e1d528"
 LOG_FILE = "tyremate_log.txt"
+QUARANTINE_FILE = "tyremate_quarantine.txt"
 
 DB_CONFIG = {
     'host': 'localhost',
@@ -23,14 +40,81 @@ DB_CONFIG = {
     'password': '',
     'database': 'tyremate_data'
 }
+KNOWN_DEVICES_FILE = "known_devices.json"
+KNOWN_DEVICE_TIMEOUT = 3.0
+KNOWN_DEVICE_MAX_AGE_DAYS = 30
+CONNECT_TIMEOUT = 10.0
+MAX_LINK_FAILURES = 5
+MAX_RECONNECT_DELAY = 30
+SHUTDOWN_TIMEOUT = 5.0
+# Methods timed by Metrics, and the stage each one reports under
+TIMED_METHODS = (
+    ("decode", "decode_tyremate_notification"),
+    ("qr", "generate_qr_code"),
+    ("db_save", "save_to_database"),
+    ("alerts", "evaluate_alerts"),
+    ("log", "log_to_notepad"),
+    ("frame_store", "log_to_frame_store"),
+    ("ui_append", "append_to_data_display"),
+    ("ui_append", "append_to_device_info"),
+    ("ui_append", "append_to_db_status"),
+    ("ui_flush", "flush_ui"),
+)
+STATS_PANEL_STAGES = ("queue_wait", "decode", "db_save", "db_flush", "end_to_end", "qr", "log", "ui_append", "ui_flush")
+
+
+class DeviceLink:
+    def __init__(self, address, name):
+        self.address = address
+        self.name = name
+        self.device = None
+        self.client = None
+        self.wake = asyncio.Event()
+        # Dialled from the known-devices cache and not connected yet: does not take a max_links slot
+        self.dial_in = False
+        self.connected = False
+        self.connects = 0
+        self.disconnects = 0
+        self.failures = 0
+        self.frames = 0
+        self.last_frame_at = None
+        self.pending_since = None
+        self.connect_latency = None
+        self.reconnect_latency = None
+
+    def summary(self):
+        state = "✅" if self.connected else "⏳"
+        age = f", last {time.time() - self.last_frame_at:.0f}s ago" if self.last_frame_at else ""
+        latency = ""
+        if self.connect_latency is not None:
+            latency = f", connect {self.connect_latency:.1f}s"
+        if self.reconnect_latency is not None:
+            latency += f", reconnect {self.reconnect_latency:.1f}s"
+        return f"{state} {self.address}: {self.frames} frames, {self.connects} connects, {self.disconnects} drops{latency}{age}"
+
 
 class TyremateApp:
     def __init__(self, root, config=None, stop_callback=None):
+        # root=None runs headless (no widgets), e.g. under the replay benchmark
         self.root = root
+        self.headless = root is None
+        self.ui_running = False
         self.config = config or {}
         self.stop_callback = stop_callback
         self.separator = self.config.get("separator", ",")
         self.fields = self.config.get("fields", {})
+        self.qr_renderer = QRRenderer(
+            self.fields, self.separator,
+            cache_size=int(self.config.get("qr_cache_size", 128)),
+            workers=int(self.config.get("qr_workers", 0)),
+        )
+        self.last_qr_payload = None
+        self.pending_qr = None
+        self.pending_status = None
+        # Any thread may post here; one root.after tick per frame applies everything at once
+        self.ui_messages = deque(maxlen=int(self.config.get("ui_queue_size", 10000)))
+        self.ui_interval = max(1, int(1000 / float(self.config.get("ui_fps", 10))))
+        self.ui_max_lines = int(self.config.get("ui_max_lines", 1000))
 
         logging.basicConfig(
             filename="tyremate_error.log",
@@ -43,17 +127,138 @@ class TyremateApp:
             self.root.geometry("1000x700")
 
         self.running = False
-        self.client = None
+        self.links = {}
+        self.link_tasks = {}
+        self.max_links = int(self.config.get("max_links", 4))
+        self.known_devices_file = self.config.get("known_devices_file", KNOWN_DEVICES_FILE)
+        self.known_device_timeout = float(self.config.get("known_device_timeout", KNOWN_DEVICE_TIMEOUT))
+        self.known_devices = self.load_known_devices()
         self.loop = None
         self.scanning = False
-        self.db_connection = None
+        self.db = get_manager(self.db_settings())
+        self.db_ready = False
         self.current_qr_image = None
         self.current_sensor_id = None
         self.current_qr_path = None
+        self.frame_source = ReplaySource.from_config(self.config)
+        self.log_writer = LogAppender(
+            LOG_FILE,
+            flush_interval=float(self.config.get("log_flush_interval", 1.0)),
+            max_bytes=int(self.config.get("log_max_bytes", 10 * 1024 * 1024)),
+            rotate_daily=self.config.get("log_rotate_daily", True),
+            compress=self.config.get("log_compress", True),
+            backups=int(self.config.get("log_backups", 14)),
+        )
+        # "csv" keeps the notepad log, "binary" writes raw frames to the frame store, "both" does both
+        self.log_sink = self.config.get("log_sink", "csv")
+        self.frame_store = FrameStore(
+            self.config.get("frame_dir", FRAME_DIR),
+            segment_records=int(self.config.get("frame_segment_records", 1_000_000)),
+            flush_interval=float(self.config.get("frame_flush_interval", 5.0)),
+        )
+
+        self.dedup = DuplicateFilter(window=float(self.config.get("dedup_window", 1.0)))
+        self.validator = FrameValidator.from_config(self.config, on_reject=self.on_frame_rejected)
+        # Rejected frames are kept raw in their own log so a bad sensor can be looked into later
+        self.quarantine = None
+        quarantine_file = self.config.get("quarantine_file", QUARANTINE_FILE)
+        if quarantine_file:
+            self.quarantine = LogAppender(
+                quarantine_file,
+                header="Timestamp,Reason,Raw Data\n",
+                flush_interval=float(self.config.get("log_flush_interval", 1.0)),
+                max_bytes=int(self.config.get("log_max_bytes", 10 * 1024 * 1024)),
+                backups=int(self.config.get("log_backups", 14)),
+            )
+
+        self.pipeline = IngestPipeline(
+            decode=self.decode_frame,
+            persist=self.persist_reading,
+            qr=self.render_qr_for_reading,
+            ui=self.display_reading,
+            maxsize=int(self.config.get("queue_size", 1000)),
+            drop_policy=self.config.get("drop_policy", DROP_OLDEST),
+        )
+
+        self.spool = None
+        if self.config.get("spool_enabled", True):
+            self.spool = Spool(
+                self.config.get("spool_file", SPOOL_FILE), on_error=self.on_writer_error, on_rejected=self.on_rows_rejected
+            )
+        self.spool_retry_interval = float(self.config.get("spool_retry_interval", 5.0))
+        # ingest_id is "<session>-<sequence>": unique per reading however coarse the clock, and kept
+        # with the row through the spool so a replay inserts it once
+        self.ingest_session = uuid.uuid4().hex[:16]
+        self.ingest_seq = count(1)
+        self.writer = BatchWriter(
+            self.db,
+            query=insert_reading_query(self.db.dialect),
+            batch_size=int(self.config.get("db_batch_size", 200)),
+            flush_interval=float(self.config.get("db_flush_interval", 1.0)),
+            on_error=self.on_writer_error,
+            on_failed=self.on_writer_failed,
+            on_rejected=self.on_rows_rejected,
+        )
+        self.rollup_writer = BatchWriter(
+            self.db,
+            query=rollup_upsert_query(self.db.dialect),
+            batch_size=500,
+            flush_interval=float(self.config.get("rollup_flush_interval", 5.0)),
+            on_error=self.on_writer_error,
+        )
+        self.rollups = RollupEngine(self.rollup_writer.add, self.config.get("rollup_resolutions", RESOLUTIONS))
+        self.alert_writer = BatchWriter(
+            self.db,
+            query=alert_insert_query(self.db.dialect),
+            batch_size=50,
+            flush_interval=1.0,
+            on_error=self.on_writer_error,
+        )
+        self.alerts = None
+        if self.config.get("alerts_enabled", True):
+            self.alerts = AlertEngine.from_config(self.config, on_alert=self.on_alert)
+        self.retention = Retention.from_config(
+            self.db, self.config, on_progress=lambda text: self.append_to_db_status(text + "\n")
+        )
+        self.maintenance_interval = float(self.config.get("maintenance_interval", 60.0))
+        self.maintenance_stop = threading.Event()
+        # Blocking DB calls started from coroutines go here, never onto the BLE loop itself
+        self.db_executor = BlockingExecutor("db", timeout=float(self.config.get("db_timeout", 5.0)))
+        self.loop_monitor = LoopLagMonitor(float(self.config.get("loop_lag_interval", 0.1)))
+        self.metrics = Metrics()
+        if self.config.get("metrics_enabled", True):
+            for stage, name in TIMED_METHODS:
+                setattr(self, name, self.metrics.timed(stage, getattr(self, name)))
+            self.writer.on_flush = self.on_rows_committed
+        self.metrics_exporter = MetricsExporter(
+            self.metrics,
+            path=self.config.get("metrics_file"),
+            interval=float(self.config.get("metrics_interval", 10.0)),
+            port=self.config.get("metrics_port"),
+        )
 
-        self.create_widgets()
+        if not self.headless:
+            self.create_widgets()
+        self.writer.start()
+        self.rollup_writer.start()
+        self.alert_writer.start()
+        try:
+            self.metrics_exporter.start()
+        except OSError as e:
+            # A busy metrics_port costs the endpoint, not the scan session
+            logging.warning(f"Metrics endpoint not started on port {self.metrics_exporter.port}: {e}")
+            self.append_to_db_status(f"⚠️ Metrics endpoint not started on port {self.metrics_exporter.port}: {str(e)}\n")
+        threading.Thread(target=self.run_maintenance, name="maintenance", daemon=True).start()
+        if self.spool:
+            self.spool.start()
+            threading.Thread(target=self.run_spool_replay, name="spool-replay", daemon=True).start()
+        self.pipeline.start()
+        if not self.headless:
+            self.ui_running = True
+            self.refresh_stats()
+            self.flush_ui()
         self.setup_async()
-        self.initialize_database()
+        asyncio.run_coroutine_threadsafe(self.initialize_database_async(), self.loop)
 
         if self.config.get("log_enabled"):
             self.initialize_log_file()
@@ -62,6 +267,7 @@ class TyremateApp:
         self.loop = asyncio.new_event_loop()
         self.thread = threading.Thread(target=self.run_async_loop, daemon=True)
         self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.loop_monitor.run(), self.loop)
 
     def run_async_loop(self):
         asyncio.set_event_loop(self.loop)
@@ -100,18 +306,37 @@ class TyremateApp:
         self.scan_btn = ttk.Button(control_frame, text="Start Scan", command=self.toggle_scan)
         self.scan_btn.pack(side=tk.LEFT, padx=5)
 
+        self.pipeline_var = tk.StringVar(value="")
+        ttk.Label(control_frame, textvariable=self.pipeline_var, foreground="gray").pack(side=tk.LEFT, padx=10)
+
         db_frame = ttk.LabelFrame(left_panel, text="Database Status", padding=10)
         db_frame.pack(fill=tk.X, padx=5, pady=5)
 
         self.db_status = scrolledtext.ScrolledText(db_frame, height=2, state=tk.DISABLED)
         self.db_status.pack(fill=tk.X)
 
+        self.writer_var = tk.StringVar(value="")
+        ttk.Label(db_frame, textvariable=self.writer_var, foreground="gray").pack(fill=tk.X)
+
         info_frame = ttk.LabelFrame(left_panel, text="Device Status", padding=10)
         info_frame.pack(fill=tk.X, padx=5, pady=5)
 
         self.device_info = scrolledtext.ScrolledText(info_frame, height=4, state=tk.DISABLED)
         self.device_info.pack(fill=tk.X)
 
+        self.links_var = tk.StringVar(value="")
+        ttk.Label(info_frame, textvariable=self.links_var, foreground="gray", justify=tk.LEFT).pack(fill=tk.X)
+
+        alerts_frame = ttk.LabelFrame(left_panel, text="Tyre Alerts", padding=10)
+        alerts_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.alerts_var = tk.StringVar(value="")
+        ttk.Label(alerts_frame, textvariable=self.alerts_var, foreground="firebrick", wraplength=600, justify=tk.LEFT).pack(fill=tk.X)
+
+        metrics_frame = ttk.LabelFrame(right_panel, text="Pipeline Latency", padding=5)
+        metrics_frame.pack(fill=tk.X, pady=(10, 0))
+        self.metrics_var = tk.StringVar(value="")
+        ttk.Label(metrics_frame, textvariable=self.metrics_var, font=("Courier", 9), justify=tk.LEFT).pack(fill=tk.X)
+
         data_frame = ttk.LabelFrame(left_panel, text="Sensor Data", padding=10)
         data_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
@@ -124,10 +349,14 @@ class TyremateApp:
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
     def initialize_log_file(self):
+        if self.log_sink in ("binary", "both"):
+            self.append_to_db_status(f"🗃️ Binary frame store: {self.frame_store.directory}\n")
+        if self.log_sink not in ("csv", "both"):
+            return
         try:
-            if not os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'w') as f:
-                    f.write("Timestamp,Sensor ID,Pressure (PSI),Temperature (°C),Voltage (V),Raw Data\n")
+            existed = os.path.exists(LOG_FILE)
+            self.log_writer.open()
+            if not existed:
                 self.append_to_db_status(f"📝 Created log file: {LOG_FILE}\n")
             else:
                 self.append_to_db_status(f"📝 Using existing log file\n")
@@ -136,40 +365,49 @@ class TyremateApp:
 
     def log_to_notepad(self, data):
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_line = f"{timestamp},{data['Sensor ID']},{data['Pressure (PSI)']},{data['Temperature (°C)']},{data['Voltage (V)']},{data['Raw Data']}\n"
-            with open(LOG_FILE, 'a') as f:
-                f.write(log_line)
+            timestamp = data.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+            log_line = f"{timestamp},{data.sensor_id},{data.pressure},{data.temperature},{data.voltage},{data.raw_hex}\n"
+            self.log_writer.write(log_line)
             self.append_to_data_display("📝 Logged to notepad\n")
         except Exception as e:
             self.append_to_data_display(f"❌ Log error: {str(e)}\n")
 
-    def initialize_database(self):
+    def log_to_frame_store(self, data):
+        try:
+            self.frame_store.append(data.received_at, data.raw)
+        except Exception as e:
+            self.append_to_data_display(f"❌ Frame store error: {str(e)}\n")
+
+    def db_settings(self):
+        # The config tab blanks host/user when DB saving is off; fall back to the defaults then
+        settings = dict(DB_CONFIG)
+        if self.config.get("host"):
+            settings.update({k: self.config[k] for k in ("host", "port", "user", "password") if k in self.config})
+        for key in ("db_pool_size", "db_health_check_interval", "db_connect_timeout", "db_backend", "sqlite_path"):
+            if key in self.config:
+                settings[key] = self.config[key]
+        return settings
+
+    async def initialize_database_async(self):
+        try:
+            await self.db_executor.run(self.initialize_database)
+        except asyncio.TimeoutError:
+            self.append_to_db_status(f"❌ DB Error: no answer within {self.db_executor.timeout:.0f} s\n")
+
+    def initialize_database(self, quiet=False):
         try:
-            self.db_connection = mysql.connector.connect(**DB_CONFIG)
-            cursor = self.db_connection.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']}")
-            cursor.execute(f"USE {DB_CONFIG['database']}")
-            cursor.execute("SHOW TABLES LIKE 'sensor_readings'")
-            if not cursor.fetchone():
-                cursor.execute("""
-                    CREATE TABLE sensor_readings (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        timestamp DATETIME,
-                        sensor_id VARCHAR(10),
-                        pressure_psi DECIMAL(5,2),
-                        temperature DECIMAL(5,2),
-                        voltage DECIMAL(5,3),
-                        raw_data VARCHAR(50),
-                        qr_code_path VARCHAR(255)
-                    )
-                """)
-                self.db_connection.commit()
+            self.db.ensure_database(DB_CONFIG['database'])
+            previous, current = migrate_schema(self.db, DB_CONFIG['database'])
+            if previous != current:
+                self.append_to_db_status(f"🔧 Schema migrated v{previous} → v{current}\n")
+            self.db_ready = True
             self.append_to_db_status("✅ DB Ready\n")
-            cursor.close()
         except Exception as e:
-            self.append_to_db_status(f"❌ DB Error: {str(e)}\n")
-            self.db_connection = None
+            if not quiet:
+                self.append_to_db_status(f"❌ DB Error: {str(e)}\n")
+                if self.spool:
+                    self.append_to_db_status(f"📥 Spooling readings to {self.spool.path} until the database is reachable\n")
+            self.db_ready = False
     def view_db_table(self):
         try:
             os.system("start chrome http://localhost/phpmyadmin")  # Adjust if using SQLite or another DB viewer
@@ -178,42 +416,66 @@ class TyremateApp:
 
     def view_notepad_log(self):
         try:
-            log_path = "tyremate_log.txt"  # Adjust to your actual log file path
-            os.startfile(log_path)
+            # Only the tail is read, so this stays fast however large the log has grown
+            self.log_writer.flush()
+            lines = tail_lines(LOG_FILE, int(self.config.get("log_view_lines", 500)))
+        except Exception as e:
+            self.append_to_data_display(f"❌ Could not open log file: {e}\n")
+            return
+
+        log_window = tk.Toplevel(self.root)
+        log_window.title(f"{LOG_FILE} (last {len(lines)} lines)")
+        log_window.geometry("800x400")
+        text = scrolledtext.ScrolledText(log_window)
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state=tk.DISABLED)
+        text.see(tk.END)
+        text.pack(fill=tk.BOTH, expand=True)
+
+        button_frame = ttk.Frame(log_window)
+        button_frame.pack(pady=5)
+        ttk.Button(button_frame, text="Open in Notepad", command=self.open_log_externally).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=log_window.destroy).pack(side=tk.LEFT, padx=5)
+
+    def open_log_externally(self):
+        try:
+            os.startfile(LOG_FILE)
         except Exception as e:
             self.append_to_data_display(f"❌ Could not open log file: {e}\n")
 
     def generate_qr_code(self, sensor_data, sensor_id):
         try:
-            values = [sensor_id]
-            if self.fields.get("pressure"):
-                values.append(str(sensor_data['Pressure (PSI)']))
-            if self.fields.get("temperature"):
-                values.append(str(sensor_data['Temperature (°C)']))
-            if self.fields.get("battery"):
-                values.append(str(sensor_data['Voltage (V)']))
-            if self.fields.get("datetime"):
-                values.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-            if self.fields.get("raw"):
-                values.append(sensor_data["Raw Data"])
-
-            qr_data = self.separator.join(values)
-            qr = qrcode.make(qr_data)
-            qr_dir = "qr_codes"
-            os.makedirs(qr_dir, exist_ok=True)
-            qr_path = f"{qr_dir}/sensor_{sensor_id}_{datetime.now().strftime('%d%m%Y')}.png"
-
-            qr.save(qr_path)
+            qr_data = self.qr_renderer.payload(sensor_data, sensor_id)
+            qr_path = self.qr_path_for(sensor_id)
+            self.qr_renderer.submit(qr_data, lambda qr, error: self.on_qr_rendered(qr, error, sensor_id, qr_path))
+        except Exception as e:
+            self.append_to_data_display(f"❌ QR Error: {str(e)}\n")
+
+    def on_qr_rendered(self, qr, error, sensor_id, qr_path):
+        try:
+            if error:
+                raise error
+            self.qr_renderer.save_if_changed(qr_path, qr)
             self.current_qr_path = qr_path
 
-            img = Image.open(qr_path).resize((200, 200))
-            self.current_qr_image = ImageTk.PhotoImage(img)
-            self.qr_label.config(image=self.current_qr_image)
-            self.sensor_id_label.config(text=f"Sensor ID: {sensor_id}")
-            self.append_to_data_display(f"📲 QR Generated: {qr_data}\n")
+            # Identical back-to-back frames leave the panel as it is
+            if qr.payload != self.last_qr_payload:
+                self.last_qr_payload = qr.payload
+                self.pending_qr = (qr.preview, sensor_id, qr.payload)
         except Exception as e:
             self.append_to_data_display(f"❌ QR Error: {str(e)}\n")
 
+    def qr_path_for(self, sensor_id):
+        return f"{QR_DIR}/sensor_{sensor_id}_{datetime.now().strftime('%d%m%Y')}.png"
+
+    def show_qr_image(self, img, sensor_id, qr_data):
+        # PhotoImage must be created on the Tk thread
+        from PIL import ImageTk
+        self.current_qr_image = ImageTk.PhotoImage(img)
+        self.qr_label.config(image=self.current_qr_image)
+        self.sensor_id_label.config(text=f"Sensor ID: {sensor_id}")
+        self.append_to_data_display(f"📲 QR Generated: {qr_data}\n")
+
     
            
 
@@ -241,110 +503,417 @@ class TyremateApp:
             self.stop_callback(self.current_qr_image)
 
     async def scan_and_connect(self):
+        if self.frame_source:
+            self.append_to_device_info("▶️ Replaying frames instead of scanning\n")
+            frames = self.frame_source.base_frames
+            if frames and not any(self.validator.accepts(frames[i]) for i in range(min(len(frames), 1000))):
+                self.append_to_device_info(
+                    "⚠️ No replayed frame passes validation, nothing will be stored; "
+                    "set validate_frames to false to replay them anyway\n"
+                )
+            await self.frame_source.run(self.notification_handler, lambda: self.scanning)
+            return
+        # Receivers seen in earlier sessions are dialled straight away, without a discovery pass
+        known = sorted(self.known_devices.items(), key=lambda item: item[1].get("last_seen", 0), reverse=True)
+        for address, info in known[:self.max_links]:
+            self.start_link(address, info.get("name", TARGET_NAME), dial_in=True)
+
+        # bleak is imported when scanning starts, not when the Scan tab is built
+        from bleak import BleakScanner
+        scanner = BleakScanner(detection_callback=self.on_advertisement)
+        scanner_running = False
         while self.scanning:
             try:
-                self.update_status("🔍 Scanning...")
-                devices = await BleakScanner.discover(timeout=5)
-                tyremate = next((d for d in devices if d.name == TARGET_NAME), None)
-                if tyremate:
-                    self.append_to_device_info(f"✅ Found {tyremate.name}\n")
-                    self.client = BleakClient(tyremate.address)
-                    await self.client.connect()
-                    await self.client.start_notify(NOTIFY_UUID, self.notification_handler)
-                    await self.client.write_gatt_char(WRITE_UUID, bytearray([0xA5]), response=True)
-                    while self.scanning and self.client.is_connected:
-                        await asyncio.sleep(1)
-                    await self.client.disconnect()
-                else:
-                    self.append_to_device_info("❌ Tyremate not found. Retrying...\n")
-                await asyncio.sleep(2)
+                self.prune_links()
+                if self.busy_slots() < self.max_links and not scanner_running:
+                    self.update_status("🔍 Scanning...")
+                    await scanner.start()
+                    scanner_running = True
+                elif self.busy_slots() >= self.max_links and scanner_running:
+                    await scanner.stop()
+                    scanner_running = False
+                await asyncio.sleep(0.5)
             except Exception as e:
                 self.append_to_device_info(f"⚠️ Scan error: {str(e)}\n")
+                await asyncio.sleep(2)
+        if scanner_running:
+            try:
+                await scanner.stop()
+            except Exception:
+                pass
+        await asyncio.gather(*self.link_tasks.values(), return_exceptions=True)
+        self.link_tasks.clear()
+
+    def on_advertisement(self, device, advertisement_data):
+        # Runs on the event loop for every advertisement, so connect the moment a receiver shows up
+        name = device.name or advertisement_data.local_name
+        if name == TARGET_NAME and self.scanning:
+            self.start_link(device.address, name, device)
+
+    def prune_links(self):
+        for address in [a for a, task in self.link_tasks.items() if task.done()]:
+            del self.link_tasks[address]
+
+    def busy_slots(self):
+        busy = 0
+        for address, task in self.link_tasks.items():
+            link = self.links.get(address)
+            if link is not None and not link.dial_in and not task.done():
+                busy += 1
+        return busy
+
+    def start_link(self, address, name, device=None, dial_in=False):
+        self.prune_links()
+        if address in self.link_tasks:
+            link = self.links[address]
+            if device is not None:
+                # Advertising right now, so it is dialled like any discovered receiver
+                link.device = device
+                link.dial_in = False
+            # Already being dialled; a fresh advertisement cuts the backoff short
+            link.wake.set()
+            return
+        if not dial_in and self.busy_slots() >= self.max_links:
+            return
+        link = self.links.get(address)
+        if link is None:
+            link = self.links[address] = DeviceLink(address, name)
+        if device is not None:
+            link.device = device
+        link.dial_in = dial_in
+        self.append_to_device_info(f"{'📇 Dialling' if dial_in else '✅ Found'} {name} ({address})\n")
+        link.failures = 0
+        link.pending_since = time.monotonic()
+        self.link_tasks[address] = asyncio.create_task(self.maintain_link(link))
+
+    async def maintain_link(self, link):
+        # One task per receiver: connect, subscribe, and reconnect by address until scanning stops
+        from bleak import BleakClient
+        delay = 0
+        while self.scanning and link.failures < MAX_LINK_FAILURES:
+            if link.dial_in and self.busy_slots() >= self.max_links:
+                break
+            try:
+                link.wake.clear()
+                # A cached receiver that is out of range should give way quickly to ones being discovered
+                timeout = self.known_device_timeout if link.dial_in else CONNECT_TIMEOUT
+                link.client = BleakClient(link.device or link.address, timeout=timeout)
+                await link.client.connect()
+                await link.client.start_notify(NOTIFY_UUID, lambda sender, data: self.on_link_frame(link, sender, data))
+                await link.client.write_gatt_char(WRITE_UUID, bytearray([0xA5]), response=True)
+                latency = time.monotonic() - link.pending_since
+                if link.connects:
+                    link.reconnect_latency = latency
+                else:
+                    link.connect_latency = latency
+                link.connected = True
+                link.dial_in = False
+                link.connects += 1
+                link.failures = 0
+                delay = 0
+                self.remember_device(link)
+                while self.scanning and link.client.is_connected:
+                    await asyncio.sleep(1)
+            except Exception as e:
+                link.failures += 1
+                self.append_to_device_info(f"⚠️ {link.address}: {str(e)}\n")
+                if link.dial_in:
+                    # One try at the cached address; if it advertises later the scanner picks it up
+                    self.append_to_device_info(f"📇 {link.address} not reachable, waiting for it to advertise\n")
+                    break
+            finally:
+                if link.connected:
+                    link.pending_since = time.monotonic()
+                link.connected = False
+                try:
+                    if link.client.is_connected:
+                        await link.client.disconnect()
+                except Exception:
+                    pass
+            if self.scanning:
+                link.disconnects += 1
+                self.append_to_device_info(f"🔌 {link.address} lost, reconnecting in {delay}s\n")
+                try:
+                    await asyncio.wait_for(link.wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(max(delay * 2, 1), MAX_RECONNECT_DELAY)
+        if not link.connects and self.links.get(link.address) is link:
+            del self.links[link.address]
+
+    def load_known_devices(self):
+        try:
+            with open(self.known_devices_file, "r") as f:
+                devices = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Receivers not seen for a while are dropped so they stop being dialled at every scan
+        cutoff = time.time() - float(self.config.get("known_device_max_age_days", KNOWN_DEVICE_MAX_AGE_DAYS)) * 86400
+        return {address: info for address, info in devices.items() if info.get("last_seen", 0) >= cutoff}
+
+    def remember_device(self, link):
+        self.known_devices[link.address] = {"name": link.name, "last_seen": time.time()}
+        try:
+            with open(self.known_devices_file, "w") as f:
+                json.dump(self.known_devices, f, indent=4)
+        except OSError as e:
+            self.append_to_device_info(f"⚠️ Could not save device cache: {str(e)}\n")
+
+    def on_link_frame(self, link, sender, data):
+        link.frames += 1
+        link.last_frame_at = time.time()
+        self.notification_handler(sender, data)
 
     async def disconnect_if_connected(self):
-        if self.client and self.client.is_connected:
-            await self.client.disconnect()
+        clients = [link.client for link in list(self.links.values()) if link.client and link.client.is_connected]
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
 
-    def decode_tyremate_notification(self, data: bytes):
-        if len(data) < 10:
-            return {}
-        pressure_raw = int.from_bytes([data[5], data[6]], byteorder='big')
-        temp_raw = data[7]
-        voltage_raw = data[8]
-        return {
-            "Sensor ID": f"{data[1]:02X}{data[2]:02X}",
-            "Pressure (PSI)": round((pressure_raw / 6.895) - 15, 2),
-            "Temperature (°C)": temp_raw - 52,
-            "Voltage (V)": round((voltage_raw + 150) / 100, 3),
-            "Raw Data": data.hex().upper()
-        }
+    async def stop_async_tasks(self):
+        # Disconnect while the loop still runs, then cancel link, scanner and lag-probe tasks so none
+        # is left pending on a closed loop
+        await self.disconnect_if_connected()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def decode_tyremate_notification(self, data: bytes, received_at=None):
+        return unpack_frame(data, received_at)
 
     def notification_handler(self, sender, data):
-        decoded = self.decode_tyremate_notification(data)
-        self.generate_qr_code(decoded, decoded['Sensor ID'])
-        output = f"📥 Received: {decoded['Raw Data']}\n"
-        output += f"Sensor ID: {decoded['Sensor ID']}, Pressure: {decoded['Pressure (PSI)']} PSI, Temp: {decoded['Temperature (°C)']}°C, Volt: {decoded['Voltage (V)']}V\n"
-        self.root.after(0, self.append_to_data_display, output)
-        if self.save_to_database(decoded):
-            if self.config.get("log_enabled"):
-                self.log_to_notepad(decoded)
+        self.pipeline.submit(data)
+
+    def decode_frame(self, item):
+        received_at, data = item
+        self.metrics.observe("queue_wait", time.time() - received_at)
+        # Garbage is dropped here, before the DB, QR, log and UI stages ever see it
+        if not self.validator.check_frame(data, received_at):
+            return None
+        if self.dedup.is_duplicate(data, received_at):
+            return None
+        reading = self.decode_tyremate_notification(data, received_at)
+        if reading is None or not self.validator.check_reading(reading):
+            return None
+        return reading
+
+    def on_frame_rejected(self, reason, data, received_at):
+        self.metrics.count("rejected_frames", "reason", reason)
+        self.write_quarantine(
+            datetime.fromtimestamp(received_at).strftime("%Y-%m-%d %H:%M:%S"), reason, bytes(data).hex().upper()
+        )
+
+    def write_quarantine(self, stamp, reason, raw_hex):
+        if self.quarantine:
+            if not self.quarantine.running:
+                self.quarantine.open()
+            self.quarantine.write(f"{stamp},{reason},{raw_hex}\n")
+
+    def persist_reading(self, reading):
+        self.rollups.add(reading)
+        if self.alerts:
+            self.evaluate_alerts(reading)
+        # The log no longer depends on the database: an outage must not cost the local copy too
+        self.save_to_database(reading)
+        if self.config.get("log_enabled"):
+            if self.log_sink in ("csv", "both"):
+                self.log_to_notepad(reading)
+            if self.log_sink in ("binary", "both"):
+                self.log_to_frame_store(reading)
+
+    def evaluate_alerts(self, reading):
+        self.alerts.update(reading)
+
+    def on_alert(self, alert):
+        message = alert.message()
+        logging.warning(message)
+        self.append_to_data_display(message + "\n")
+        self.update_status(message)
+        if self.db_ready:
+            self.alert_writer.add(alert.row())
+
+    def render_qr_for_reading(self, reading):
+        self.generate_qr_code(reading, reading.sensor_id)
+
+    def display_reading(self, reading):
+        output = f"📥 Received: {reading.raw_hex}\n"
+        output += f"Sensor ID: {reading.sensor_id}, Pressure: {reading.pressure} PSI, Temp: {reading.temperature}°C, Volt: {reading.voltage}V\n"
+        self.append_to_data_display(output)
+
+    def refresh_stats(self):
+        if not self.ui_running:
+            return
+        self.pipeline_var.set(
+            f"{self.pipeline.summary()} | 🔁 {self.dedup.total_suppressed()} duplicates suppressed | {self.validator.summary()}"
+        )
+        self.writer_var.set(f"💾 {self.writer.summary()}" + (f" | 📥 {self.spool.summary()}" if self.spool else ""))
+        self.links_var.set("\n".join([self.loop_monitor.summary()] + [link.summary() for link in self.links.values()]))
+        self.metrics_var.set(self.metrics.table(STATS_PANEL_STAGES))
+        self.alerts_var.set(self.alerts.summary() if self.alerts else "Alerts disabled")
+        self.root.after(1000, self.refresh_stats)
 
     def save_to_database(self, sensor_data):
-        if not self.db_connection:
+        if not self.db_ready and not self.spool:
             return False
         try:
-            cursor = self.db_connection.cursor()
-            query = """
-                INSERT INTO sensor_readings 
-                (timestamp, sensor_id, pressure_psi, temperature, voltage, raw_data, qr_code_path)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
             values = (
-                datetime.now(),
-                sensor_data['Sensor ID'],
-                sensor_data['Pressure (PSI)'],
-                sensor_data['Temperature (°C)'],
-                sensor_data['Voltage (V)'],
-                sensor_data['Raw Data'],
-                self.current_qr_path
+                sensor_data.timestamp,
+                sensor_data.sensor_id,
+                sensor_data.pressure,
+                sensor_data.temperature,
+                sensor_data.voltage,
+                sensor_data.raw_hex,
+                self.qr_path_for(sensor_data.sensor_id),
+                f"{self.ingest_session}-{next(self.ingest_seq):x}"
             )
-            cursor.execute(query, values)
-            self.db_connection.commit()
-            cursor.close()
+            if self.db_ready:
+                self.writer.add(values)
+            else:
+                self.spool.add(values)
             return True
         except Exception as e:
             self.append_to_data_display(f"❌ DB Save Error: {str(e)}\n")
             return False
 
+    def run_maintenance(self):
+        while not self.maintenance_stop.wait(self.maintenance_interval):
+            self.rollups.close_idle(time.time())
+            # Frames appended just before the stream went quiet get into the on-disk index too
+            self.frame_store.flush()
+            # Rollups outlive the raw rows, so trends stay queryable after a purge
+            if not self.retention.busy:
+                self.retention.submit(self.retention.enforce, self.db_ready)
+
+    def on_rows_committed(self, rows, committed_at):
+        self.metrics.observe("db_flush", self.writer.last_flush_ms / 1000)
+        for row in rows:
+            # The timestamp column is the receive time, so notification-to-commit needs no extra column
+            self.metrics.observe("end_to_end", committed_at - row[0].timestamp(), row[1])
+
+    def on_writer_failed(self, rows):
+        # Only called when the database could not be reached; rows it refused go to on_rows_rejected
+        if not self.spool:
+            return
+        # Stop sending to the server until the replay thread reaches it again
+        if self.db_ready:
+            self.db_ready = False
+            self.append_to_db_status(f"📥 Database unreachable, spooling readings to {self.spool.path}\n")
+        self.spool.add_many(rows)
+
+    def on_rows_rejected(self, rejected):
+        # The server refused these rows (e.g. a value too large for its column): spooling them would
+        # only fail again, so they are quarantined with the frames the validator turned away
+        row, error = rejected[0]
+        self.append_to_data_display(f"❌ DB rejected {len(rejected)} readings, e.g. from {row[1]}: {str(error)}\n")
+        for row, error in rejected:
+            self.metrics.count("rejected_frames", "reason", "db_rejected")
+            self.write_quarantine(str(row[0])[:19], "db_rejected", row[5])
+
+    def run_spool_replay(self):
+        while not self.maintenance_stop.wait(self.spool_retry_interval):
+            if not self.spool.pending():
+                continue
+            if not self.db_ready:
+                self.initialize_database(quiet=True)
+            if not self.db_ready:
+                continue
+            try:
+                replayed = self.spool.replay(self.db, DB_CONFIG['database'])
+                if replayed:
+                    self.append_to_db_status(f"📤 Replayed {replayed} spooled readings\n")
+            except Exception as e:
+                self.db_ready = False
+                self.append_to_db_status(f"❌ Spool replay failed: {str(e)}\n")
+
+    def on_writer_error(self, error, row_count):
+        self.append_to_data_display(f"❌ DB Save Error ({row_count} rows): {str(error)}\n")
+
     def append_to_data_display(self, text):
-        self.data_display.config(state=tk.NORMAL)
-        self.data_display.insert(tk.END, text)
-        self.data_display.config(state=tk.DISABLED)
-        self.data_display.see(tk.END)
+        if not self.headless:
+            self.ui_messages.append(("data_display", text))
 
     def append_to_device_info(self, text):
-        self.device_info.config(state=tk.NORMAL)
-        self.device_info.insert(tk.END, text)
-        self.device_info.config(state=tk.DISABLED)
-        self.device_info.see(tk.END)
+        if not self.headless:
+            self.ui_messages.append(("device_info", text))
 
     def append_to_db_status(self, text):
-        self.db_status.config(state=tk.NORMAL)
-        self.db_status.insert(tk.END, text)
-        self.db_status.config(state=tk.DISABLED)
-        self.db_status.see(tk.END)
+        if not self.headless:
+            self.ui_messages.append(("db_status", text))
 
     def update_status(self, text):
-        self.status_var.set(text)
+        self.pending_status = text
 
-    def on_closing(self):
+    def flush_ui(self):
+        if not self.ui_running:
+            return
+        batches = {}
+        while True:
+            try:
+                panel, text = self.ui_messages.popleft()
+            except IndexError:
+                break
+            batches.setdefault(panel, []).append(text)
+        try:
+            for panel, texts in batches.items():
+                self.write_panel(getattr(self, panel), "".join(texts))
+            if self.pending_status is not None:
+                self.status_var.set(self.pending_status)
+                self.pending_status = None
+            if self.pending_qr is not None:
+                # Only the newest QR matters; older ones rendered in between are skipped
+                qr, self.pending_qr = self.pending_qr, None
+                self.show_qr_image(*qr)
+        except tk.TclError:
+            # Widgets were destroyed (scan session replaced or window closed)
+            self.ui_running = False
+            return
+        self.root.after(self.ui_interval, self.flush_ui)
+
+    def write_panel(self, widget, text):
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, text)
+        lines = int(widget.index("end-1c").split(".")[0])
+        if lines > self.ui_max_lines:
+            widget.delete("1.0", f"{lines - self.ui_max_lines + 1}.0")
+        widget.config(state=tk.DISABLED)
+        widget.see(tk.END)
+
+    def shutdown(self):
         self.scanning = False
-        if self.loop:
-            asyncio.run_coroutine_threadsafe(self.disconnect_if_connected(), self.loop)
+        self.ui_running = False
+        self.loop_monitor.stop()
+        if self.loop and not self.loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(self.stop_async_tasks(), self.loop)
+            try:
+                future.result(timeout=SHUTDOWN_TIMEOUT)
+            except Exception as e:
+                logging.warning(f"BLE shutdown did not finish cleanly: {e}")
             self.loop.call_soon_threadsafe(self.loop.stop)
-        if self.db_connection and self.db_connection.is_connected():
-            self.db_connection.close()
-        self.root.destroy()
+            self.thread.join(SHUTDOWN_TIMEOUT)
+            if not self.thread.is_alive():
+                self.loop.close()
+        self.pipeline.stop()
+        self.qr_renderer.close()
+        # Flush whatever the persist stage queued and hand the connection back to the pool
+        self.writer.close()
+        self.maintenance_stop.set()
+        self.retention.close()
+        self.rollups.flush_open()
+        self.rollup_writer.close()
+        self.alert_writer.close()
+        if self.spool:
+            self.spool.close()
+        self.db_executor.shutdown()
+        self.log_writer.close()
+        if self.quarantine:
+            self.quarantine.close()
+        self.frame_store.close()
+        # Last, so the final export includes the rows flushed above
+        self.metrics_exporter.stop()
+
+    def on_closing(self):
+        self.shutdown()
+        if not self.headless:
+            self.root.destroy()
 
 
 # Standalone mode (for testing)
@@ -0,0 +1,634 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_DATABASE = "tyremate_data"
+DEFAULT_PORT = 3307
+DEFAULT_CONNECT_TIMEOUT = 3
+
+
+def mysql_connector():
+    # Imported on first MySQL use: it is the slowest import at startup and SQLite sessions never need it
+    import mysql.connector
+    return mysql.connector
+
+# ingest_id identifies a reading (app session + sequence number), so replaying a spool twice inserts it once
+IDEMPOTENT_INSERT_SUFFIX = {
+    "mysql": " ON DUPLICATE KEY UPDATE id = id",
+    "sqlite": " ON CONFLICT (ingest_id) DO NOTHING",
+}
+
+
+def insert_reading_query(dialect, table=None):
+    name = quote(dialect, table or READINGS_TABLE)
+    return (f"INSERT INTO {name} "
+            "(timestamp, sensor_id, pressure_psi, temperature, voltage, raw_data, qr_code_path, ingest_id) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)" + IDEMPOTENT_INSERT_SUFFIX[dialect])
+
+READINGS_TABLE = "sensor_readings"
+
+READINGS_TABLE_DDL = {
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS `{table}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            timestamp DATETIME,
+            sensor_id VARCHAR(10),
+            pressure_psi DECIMAL(5,2),
+            temperature DECIMAL(5,2),
+            voltage DECIMAL(5,3),
+            raw_data VARCHAR(50),
+            qr_code_path VARCHAR(255)
+        )
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS "{table}" (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP,
+            sensor_id TEXT,
+            pressure_psi REAL,
+            temperature REAL,
+            voltage REAL,
+            raw_data TEXT,
+            qr_code_path TEXT
+        )
+    """,
+}
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        table_name VARCHAR(64) PRIMARY KEY,
+        version INT NOT NULL
+    )
+"""
+
+ROLLUP_COLUMNS = (
+    "sensor_id", "resolution", "bucket_start", "readings",
+    "pressure_min", "pressure_max", "pressure_sum",
+    "temperature_min", "temperature_max", "temperature_sum",
+    "voltage_min", "voltage_max", "voltage_sum",
+)
+
+ROLLUP_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        sensor_id VARCHAR(10) NOT NULL,
+        resolution INT NOT NULL,
+        bucket_start {timestamp} NOT NULL,
+        readings INT NOT NULL,
+        pressure_min DECIMAL(5,2), pressure_max DECIMAL(5,2), pressure_sum DOUBLE,
+        temperature_min DECIMAL(5,2), temperature_max DECIMAL(5,2), temperature_sum DOUBLE,
+        voltage_min DECIMAL(5,3), voltage_max DECIMAL(5,3), voltage_sum DOUBLE,
+        PRIMARY KEY (sensor_id, resolution, bucket_start)
+    )
+"""
+
+
+ROLLUP_MERGE = {
+    "mysql": {"min": "LEAST({c}, VALUES({c}))", "max": "GREATEST({c}, VALUES({c}))", "sum": "{c} + VALUES({c})"},
+    "sqlite": {"min": "MIN({c}, excluded.{c})", "max": "MAX({c}, excluded.{c})", "sum": "{c} + excluded.{c}"},
+}
+
+
+def rollup_table(table=None):
+    return f"{table or 'sensor_readings'}_rollups"
+
+
+def rollup_upsert_query(dialect, table=None):
+    # Buckets merge into an existing row, so a bucket flushed at shutdown and continued after a
+    # restart (or a late reading for an already-closed bucket) adds up instead of overwriting
+    name = quote(dialect, rollup_table(table))
+    columns = ", ".join(ROLLUP_COLUMNS)
+    values = ", ".join(["%s"] * len(ROLLUP_COLUMNS))
+    merge = ROLLUP_MERGE[dialect]
+    updates = ", ".join(
+        f"{c} = " + merge[c.rsplit("_", 1)[-1] if c != "readings" else "sum"].format(c=c)
+        for c in ROLLUP_COLUMNS[3:]
+    )
+    if dialect == "mysql":
+        return f"INSERT INTO {name} ({columns}) VALUES ({values}) ON DUPLICATE KEY UPDATE {updates}"
+    return (f"INSERT INTO {name} ({columns}) VALUES ({values}) "
+            f"ON CONFLICT (sensor_id, resolution, bucket_start) DO UPDATE SET {updates}")
+
+
+ALERT_COLUMNS = ("sensor_id", "rule", "state", "value", "threshold", "raised_at")
+
+ALERT_TABLE_DDL = {
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            sensor_id VARCHAR(10) NOT NULL,
+            rule VARCHAR(32) NOT NULL,
+            state VARCHAR(8) NOT NULL,
+            value DOUBLE,
+            threshold DOUBLE,
+            raised_at DATETIME NOT NULL
+        )
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sensor_id TEXT NOT NULL,
+            rule TEXT NOT NULL,
+            state TEXT NOT NULL,
+            value REAL,
+            threshold REAL,
+            raised_at TIMESTAMP NOT NULL
+        )
+    """,
+}
+
+
+def alert_table(table=None):
+    return f"{table or 'sensor_readings'}_alerts"
+
+
+def alert_insert_query(dialect, table=None):
+    name = quote(dialect, alert_table(table))
+    return f"INSERT INTO {name} ({', '.join(ALERT_COLUMNS)}) VALUES ({', '.join(['%s'] * len(ALERT_COLUMNS))})"
+
+
+# Columns of tables made by older "Create Table" buttons, renamed to the unified schema
+LEGACY_COLUMNS = {
+    "pressure": ("pressure_psi", "DECIMAL(5,2)"),
+    "battery": ("voltage", "DECIMAL(5,3)"),
+}
+
+
+def quote(dialect, name):
+    return f"`{name}`" if dialect == "mysql" else f'"{name}"'
+
+
+def table_columns(cursor, dialect, table):
+    cursor.execute(f"SELECT * FROM {quote(dialect, table)} WHERE 1 = 0")
+    cursor.fetchall()
+    return [desc[0] for desc in cursor.description]
+
+
+def _create_readings_table(cursor, dialect, table):
+    cursor.execute(READINGS_TABLE_DDL[dialect].format(table=table))
+    columns = table_columns(cursor, dialect, table)
+    name = quote(dialect, table)
+    for old, (new, column_type) in LEGACY_COLUMNS.items():
+        if old in columns and new not in columns:
+            if dialect == "mysql":
+                cursor.execute(f"ALTER TABLE {name} CHANGE `{old}` `{new}` {column_type}")
+            else:
+                cursor.execute(f'ALTER TABLE {name} RENAME COLUMN "{old}" TO "{new}"')
+    if "qr_code_path" not in columns:
+        cursor.execute(f"ALTER TABLE {name} ADD COLUMN qr_code_path VARCHAR(255)")
+
+
+def _add_reading_indexes(cursor, dialect, table):
+    # (sensor_id, timestamp) serves per-sensor latest/range/count; (timestamp) serves all-sensor ranges
+    exists = "" if dialect == "mysql" else "IF NOT EXISTS "
+    name = quote(dialect, table)
+    cursor.execute(f"CREATE INDEX {exists}{quote(dialect, f'idx_{table}_sensor_time')} ON {name} (sensor_id, timestamp)")
+    cursor.execute(f"CREATE INDEX {exists}{quote(dialect, f'idx_{table}_time')} ON {name} (timestamp)")
+
+
+def _create_rollup_table(cursor, dialect, table):
+    timestamp = "DATETIME" if dialect == "mysql" else "TIMESTAMP"
+    cursor.execute(ROLLUP_TABLE_DDL.format(name=quote(dialect, rollup_table(table)), timestamp=timestamp))
+
+
+def _add_ingest_id(cursor, dialect, table):
+    name = quote(dialect, table)
+    cursor.execute(f"ALTER TABLE {name} ADD COLUMN ingest_id VARCHAR(40)")
+    # NULLs never collide, so rows written before this migration stay valid
+    cursor.execute(f"CREATE UNIQUE INDEX {quote(dialect, f'idx_{table}_ingest')} ON {name} (ingest_id)")
+
+
+def _create_alert_table(cursor, dialect, table):
+    name = alert_table(table)
+    cursor.execute(ALERT_TABLE_DDL[dialect].format(name=quote(dialect, name)))
+    cursor.execute(f"CREATE INDEX {quote(dialect, f'idx_{name}_sensor_time')} ON {quote(dialect, name)} (sensor_id, raised_at)")
+
+
+# Version n is reached by running MIGRATIONS[n - 1]; append new steps, never edit old ones
+MIGRATIONS = [
+    _create_readings_table,
+    _add_reading_indexes,
+    _create_rollup_table,
+    _add_ingest_id,
+    _create_alert_table,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+class ConnectionManager:
+    dialect = "mysql"
+    placeholder = "%s"
+    _pool_counter = 0
+
+    def __init__(self, host="localhost", port=DEFAULT_PORT, user="root", password="",
+                 pool_size=3, health_check_interval=30.0, checkout_timeout=5.0,
+                 reconnect_attempts=3, reconnect_delay=1, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.params = {
+            "host": host or "localhost",
+            "port": int(port or DEFAULT_PORT),
+            "user": user,
+            "password": password,
+            # A stopped server should fail fast rather than after the OS TCP timeout
+            "connection_timeout": connect_timeout,
+        }
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self._pools = {}
+        self._lock = threading.Lock()
+        # Underlying connection -> when it last went back to the pool
+        self._released_at = {}
+
+        self.checkouts = 0
+        self.reconnects = 0
+        self.failures = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            host=config.get("host"),
+            port=config.get("port"),
+            user=config.get("user", "root"),
+            password=config.get("password", ""),
+            pool_size=int(config.get("db_pool_size", 3)),
+            health_check_interval=float(config.get("db_health_check_interval", 30.0)),
+            connect_timeout=int(config.get("db_connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+        )
+
+    def _pool(self, database):
+        with self._lock:
+            pool = self._pools.get(database)
+            if pool is None:
+                ConnectionManager._pool_counter += 1
+                pool = mysql_connector().pooling.MySQLConnectionPool(
+                    pool_name=f"tyremate{ConnectionManager._pool_counter}",
+                    pool_size=self.pool_size,
+                    # Nothing we run changes session state, so skip the reset round trip
+                    pool_reset_session=False,
+                    database=database,
+                    **self.params
+                )
+                self._pools[database] = pool
+            return pool
+
+    def ensure_database(self, database=DEFAULT_DATABASE):
+        connector = mysql_connector()
+        try:
+            self._pool(database)
+        except connector.errors.ProgrammingError as e:
+            if e.errno != connector.errorcode.ER_BAD_DB_ERROR:
+                raise
+            conn = connector.connect(**self.params)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+                cursor.close()
+            finally:
+                conn.close()
+            self._pool(database)
+
+    def acquire(self, database=DEFAULT_DATABASE):
+        errors = mysql_connector().errors
+        pool = self._pool(database)
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            try:
+                conn = pool.get_connection()
+                break
+            except errors.PoolError:
+                if time.monotonic() >= deadline:
+                    self.failures += 1
+                    raise
+                time.sleep(0.05)
+        self.checkouts += 1
+        # Only a connection that sat idle long enough for the server to drop it is pinged first;
+        # one handed back moments ago by the batch writer goes straight out again
+        released_at = self._released_at.get(getattr(conn, "_cnx", conn))
+        try:
+            if released_at is None or time.monotonic() - released_at >= self.health_check_interval:
+                self.check_health(conn)
+        except Exception:
+            # Back to the pool even when dead, or every failed checkout would shrink the pool by one
+            self.release(conn, healthy=False)
+            raise
+        return conn
+
+    def release(self, conn, healthy=True):
+        # Keyed by the pooled connection underneath, which the wrapper drops on close. A connection
+        # that just failed is forgotten, so the next checkout pings it instead of trusting it
+        cnx = getattr(conn, "_cnx", None)
+        if cnx is not None:
+            if healthy:
+                self._released_at[cnx] = time.monotonic()
+            else:
+                self._released_at.pop(cnx, None)
+        try:
+            # Returns the connection to its pool rather than closing the socket
+            conn.close()
+        except Exception:
+            pass
+
+    def is_row_error(self, error):
+        # The server refused the values themselves (out of range, too long, a constraint); any other
+        # error means the server or the connection is not usable right now
+        errors = mysql_connector().errors
+        return isinstance(error, (errors.DataError, errors.IntegrityError))
+
+    def check_health(self, conn):
+        # ping(reconnect=True) transparently re-opens a socket the server dropped while idle
+        errors = mysql_connector().errors
+        try:
+            conn.ping(reconnect=False)
+        except errors.Error:
+            self.reconnects += 1
+            try:
+                conn.ping(reconnect=True, attempts=self.reconnect_attempts, delay=self.reconnect_delay)
+            except errors.Error:
+                self.failures += 1
+                raise
+
+    @contextmanager
+    def connection(self, database=DEFAULT_DATABASE):
+        conn = self.acquire(database)
+        healthy = False
+        try:
+            yield conn
+            healthy = True
+        finally:
+            self.release(conn, healthy)
+
+    @contextmanager
+    def streaming_connection(self, database=DEFAULT_DATABASE):
+        # Outside the pool: an unbuffered read can hold its connection for minutes, and closing the
+        # socket is the only cheap way to abandon a result that was not read to the end
+        conn = mysql_connector().connect(database=database, **self.params)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        return {
+            "pools": len(self._pools),
+            "pool_size": self.pool_size,
+            "checkouts": self.checkouts,
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+        }
+
+
+class SQLiteManager:
+    # Same surface as ConnectionManager, for benchmarks and machines without MySQL
+    dialect = "sqlite"
+    placeholder = "?"
+
+    def __init__(self, path="tyremate_data.sqlite", health_check_interval=30.0):
+        self.path = path
+        self.health_check_interval = health_check_interval
+        self.checkouts = 0
+        self.reconnects = 0
+        self.failures = 0
+
+    def ensure_database(self, database=None):
+        pass
+
+    def acquire(self, database=None):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self.checkouts += 1
+        return conn
+
+    def release(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def is_row_error(self, error):
+        return isinstance(error, (sqlite3.DataError, sqlite3.IntegrityError))
+
+    def check_health(self, conn):
+        conn.execute("SELECT 1")
+
+    @contextmanager
+    def connection(self, database=None):
+        conn = self.acquire(database)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def streaming_connection(self, database=None):
+        return self.connection(database)
+
+    def stats(self):
+        return {
+            "pools": 0,
+            "pool_size": 0,
+            "checkouts": self.checkouts,
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+        }
+
+
+def migrate_schema(manager, database=DEFAULT_DATABASE, table=READINGS_TABLE):
+    ph = manager.placeholder
+    with manager.connection(database) as conn:
+        cursor = conn.cursor()
+        cursor.execute(SCHEMA_VERSION_DDL)
+        cursor.execute(f"SELECT version FROM schema_version WHERE table_name = {ph}", (table,))
+        row = cursor.fetchone()
+        current = row[0] if row else 0
+        for version in range(current + 1, len(MIGRATIONS) + 1):
+            MIGRATIONS[version - 1](cursor, manager.dialect, table)
+            # Record each step as it lands so a failed later step resumes from here next time
+            cursor.execute(f"DELETE FROM schema_version WHERE table_name = {ph}", (table,))
+            cursor.execute(f"INSERT INTO schema_version (table_name, version) VALUES ({ph}, {ph})", (table, version))
+            conn.commit()
+        cursor.close()
+    return current, SCHEMA_VERSION
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(config):
+    if config.get("db_backend") == "sqlite":
+        path = config.get("sqlite_path", "tyremate_data.sqlite")
+        with _managers_lock:
+            manager = _managers.get(("sqlite", path))
+            if manager is None:
+                manager = _managers[("sqlite", path)] = SQLiteManager(path)
+            return manager
+    # One manager per server/credentials so the config tab and scan tab share pools
+    key = (
+        config.get("host") or "localhost",
+        int(config.get("port") or DEFAULT_PORT),
+        config.get("user", "root"),
+        config.get("password", ""),
+    )
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager.from_config(config)
+            _managers[key] = manager
+        return manager
+
+
+def write_rows(manager, conn, query, rows):
+    # One executemany for the whole batch. If the server refuses a row, the batch is retried row by row
+    # so the others still land; returns (row, error) for each refused row and raises any other error
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.executemany(query, rows)
+            conn.commit()
+            return []
+        except Exception as e:
+            if not manager.is_row_error(e):
+                raise
+            conn.rollback()
+        rejected = []
+        for row in rows:
+            try:
+                cursor.execute(query, row)
+            except Exception as e:
+                if not manager.is_row_error(e):
+                    raise
+                rejected.append((row, e))
+        conn.commit()
+        return rejected
+    finally:
+        cursor.close()
+
+
+class BatchWriter:
+    def __init__(self, manager, query, batch_size=200, flush_interval=1.0,
+                 on_error=None, on_flush=None, on_failed=None, on_rejected=None):
+        self.manager = manager
+        self.query = query.replace("%s", manager.placeholder)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.on_flush = on_flush
+        # Receives the rows of a batch that could not be written because the database was unavailable,
+        # e.g. to spool them locally
+        self.on_failed = on_failed
+        # Receives (row, error) for rows the database refused; retrying those would only fail again
+        self.on_rejected = on_rejected
+
+        self.rows = []
+        self.first_row_at = None
+        self._rows_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.rows_rejected = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_s = 0.0
+        self.started_at = time.monotonic()
+
+    def start(self):
+        self.running = True
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="db-batch-writer", daemon=True)
+        self.thread.start()
+
+    def add(self, row):
+        with self._rows_lock:
+            if not self.rows:
+                self.first_row_at = time.monotonic()
+            self.rows.append(row)
+            full = len(self.rows) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        return len(self.rows)
+
+    def _run(self):
+        while self.running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self.running:
+                break
+            with self._rows_lock:
+                due = self.rows and (
+                    len(self.rows) >= self.batch_size
+                    or time.monotonic() - self.first_row_at >= self.flush_interval
+                )
+            if due:
+                self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._rows_lock:
+                batch, self.rows = self.rows, []
+                self.first_row_at = None
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                # A pooled connection is held only for the flush itself: the readings, rollup and
+                # alert writers would otherwise keep the pool the GUI shares with them busy for good
+                with self.manager.connection() as conn:
+                    rejected = write_rows(self.manager, conn, self.query, batch)
+            except Exception as e:
+                self.rows_failed += len(batch)
+                if self.on_error:
+                    self.on_error(e, len(batch))
+                if self.on_failed:
+                    self.on_failed(batch)
+                return 0
+            elapsed = time.perf_counter() - started
+            if rejected:
+                self.rows_rejected += len(rejected)
+                refused = {id(row) for row, _ in rejected}
+                batch = [row for row in batch if id(row) not in refused]
+                if self.on_rejected:
+                    self.on_rejected(rejected)
+            self.flushes += 1
+            self.rows_written += len(batch)
+            self.total_flush_s += elapsed
+            self.last_flush_ms = elapsed * 1000
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            if self.on_flush:
+                self.on_flush(batch, time.time())
+            return len(batch)
+
+    def close(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join(2.0)
+            self.thread = None
+        self.flush()
+
+    def stats(self):
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "rows_rejected": self.rows_rejected,
+            "pending": self.pending(),
+            "flushes": self.flushes,
+            "rows_per_sec": self.rows_written / uptime,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": (self.total_flush_s / self.flushes * 1000) if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{s['rows_written']} rows, {s['rows_per_sec']:.1f} rows/s, "
+                f"flush {s['last_flush_ms']:.1f} ms (avg {s['avg_flush_ms']:.1f}), pending {s['pending']}")
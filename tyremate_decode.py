@@ -0,0 +1,128 @@
+import struct
+import time
+from datetime import datetime
+
+# The batch decoder is optional and numpy is slow to import; single frames only need struct
+np = None
+
+FRAME_SIZE = 20
+MIN_FRAME_SIZE = 10
+
+# header, sensor id (2 bytes), 2 unused bytes, pressure (big-endian), temperature, voltage
+FRAME_STRUCT = struct.Struct(">BHxxHBB")
+
+_sensor_ids = {}
+
+
+def sensor_id_str(sensor_id):
+    # At most 65536 distinct IDs, so format each one once
+    text = _sensor_ids.get(sensor_id)
+    if text is None:
+        text = _sensor_ids[sensor_id] = f"{sensor_id:04X}"
+    return text
+
+
+def pressure_psi(raw):
+    return round((raw / 6.895) - 15, 2)
+
+
+def temperature_c(raw):
+    return raw - 52
+
+
+def voltage_v(raw):
+    return round((raw + 150) / 100, 3)
+
+
+class Reading:
+    __slots__ = ("sensor_id", "pressure", "temperature", "voltage", "raw", "received_at", "_raw_hex")
+
+    def __init__(self, sensor_id, pressure, temperature, voltage, raw, received_at):
+        self.sensor_id = sensor_id
+        self.pressure = pressure
+        self.temperature = temperature
+        self.voltage = voltage
+        self.raw = raw
+        self.received_at = received_at
+        self._raw_hex = None
+
+    @property
+    def raw_hex(self):
+        if self._raw_hex is None:
+            self._raw_hex = self.raw.hex().upper()
+        return self._raw_hex
+
+    @property
+    def header(self):
+        return self.raw[0]
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.received_at)
+
+    def as_dict(self):
+        return {
+            "Sensor ID": self.sensor_id,
+            "Pressure (PSI)": self.pressure,
+            "Temperature (°C)": self.temperature,
+            "Voltage (V)": self.voltage,
+            "Raw Data": self.raw_hex,
+        }
+
+
+def unpack_frame(data, received_at=None):
+    if len(data) < MIN_FRAME_SIZE:
+        return None
+    _, sensor_id, pressure_raw, temp_raw, voltage_raw = FRAME_STRUCT.unpack_from(data)
+    return Reading(
+        sensor_id_str(sensor_id),
+        pressure_psi(pressure_raw),
+        temperature_c(temp_raw),
+        voltage_v(voltage_raw),
+        data if isinstance(data, bytes) else bytes(data),
+        time.time() if received_at is None else received_at,
+    )
+
+
+_lookup_tables = None
+
+
+def load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _tables():
+    # Built from the scalar formulas, so the vectorised path rounds exactly like unpack_frame
+    global _lookup_tables
+    if _lookup_tables is None:
+        _lookup_tables = (
+            np.array([pressure_psi(raw) for raw in range(65536)], dtype=np.float64),
+            np.array([voltage_v(raw) for raw in range(256)], dtype=np.float64),
+        )
+    return _lookup_tables
+
+
+def unpack_frames(frames, frame_size=FRAME_SIZE):
+    try:
+        load_numpy()
+    except ImportError:
+        raise ImportError("numpy is required for batch decoding")
+    if isinstance(frames, (list, tuple)):
+        frames = b"".join(frames)
+    buf = np.frombuffer(frames, dtype=np.uint8)
+    if buf.size % frame_size:
+        raise ValueError(f"Buffer length {buf.size} is not a multiple of the {frame_size}-byte frame size")
+    rows = buf.reshape(-1, frame_size)
+    pressure_lut, voltage_lut = _tables()
+    pressure_raw = (rows[:, 5].astype(np.uint16) << 8) | rows[:, 6]
+    return {
+        "header": rows[:, 0].copy(),
+        "sensor_id": (rows[:, 1].astype(np.uint16) << 8) | rows[:, 2],
+        "pressure": pressure_lut[pressure_raw],
+        "temperature": rows[:, 7].astype(np.int16) - 52,
+        "voltage": voltage_lut[rows[:, 8]],
+    }
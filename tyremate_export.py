@@ -0,0 +1,211 @@
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from tyremate_db import DEFAULT_DATABASE, READINGS_TABLE, get_manager
+from tyremate_queries import READING_COLUMNS, ReadingQueries, as_datetime
+
+EXPORT_CHUNK = 10000
+ROW_GROUP_ROWS = 100000
+PROGRESS_INTERVAL = 0.5
+COLUMNS = [name.strip() for name in READING_COLUMNS.split(",")]
+FORMATS = ("csv", "parquet")
+
+
+def format_for(path):
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def as_float(value):
+    # MySQL DECIMAL columns arrive as Decimal
+    return None if value is None else float(value)
+
+
+class CSVSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow is required for Parquet export")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("id", pa.int64()),
+            ("timestamp", pa.timestamp("us")),
+            ("sensor_id", pa.string()),
+            ("pressure_psi", pa.float64()),
+            ("temperature", pa.float64()),
+            ("voltage", pa.float64()),
+            ("raw_data", pa.string()),
+            ("qr_code_path", pa.string()),
+        ])
+        self.converters = (None, as_datetime, None, as_float, as_float, as_float, None, None)
+        self.writer = pq.ParquetWriter(path, self.schema, compression="snappy")
+        self.row_group_rows = row_group_rows
+        self.batches = []
+        self.buffered = 0
+
+    def write(self, rows):
+        columns = []
+        for values, convert in zip(zip(*rows), self.converters):
+            columns.append([convert(v) for v in values] if convert else list(values))
+        self.batches.append(self.pa.RecordBatch.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+        self.buffered += len(rows)
+        # Chunks are gathered into row groups of a fixed size, so memory stays at one row group
+        if self.buffered >= self.row_group_rows:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if self.batches:
+            self.writer.write_table(self.pa.Table.from_batches(self.batches, schema=self.schema))
+            self.batches = []
+            self.buffered = 0
+
+    def close(self):
+        self._write_row_group()
+        self.writer.close()
+
+
+SINKS = {"csv": CSVSink, "parquet": ParquetSink}
+
+
+class Exporter:
+    def __init__(self, manager, database=DEFAULT_DATABASE, table=READINGS_TABLE, chunk=EXPORT_CHUNK,
+                 on_progress=None):
+        self.manager = manager
+        self.database = database
+        self.queries = ReadingQueries(manager, database, table)
+        self.chunk = chunk
+        self.on_progress = on_progress
+
+        self.cancelled = threading.Event()
+        self.thread = None
+        self.rows = 0
+        self.total = None
+
+    def report(self, text):
+        if self.on_progress:
+            self.on_progress(text)
+
+    def query(self, sensor_id=None, start=None, end=None):
+        where, params = self.queries.where_clause(sensor_id, start, end)
+        # A filtered export follows the (sensor_id, timestamp) or (timestamp) index; a full one reads
+        # the table in primary-key order so the server never has to sort it
+        order = "timestamp, id" if where else "id"
+        return f"SELECT {READING_COLUMNS} FROM {self.queries.table}{where} ORDER BY {order}", params
+
+    def progress_text(self):
+        if self.total:
+            return f"📤 Exported {self.rows:,} / {self.total:,} rows ({self.rows * 100 // self.total}%)"
+        return f"📤 Exported {self.rows:,} rows"
+
+    def export(self, path, fmt=None, sensor_id=None, start=None, end=None, count=True):
+        fmt = fmt or format_for(path)
+        self.rows = 0
+        self.total = self.queries.count(sensor_id, start, end) if count else None
+        query, params = self.query(sensor_id, start, end)
+        # Written under a temporary name so a failed or cancelled export never leaves a truncated file
+        partial = path + ".part"
+        sink = SINKS[fmt](partial)
+        try:
+            with self.manager.streaming_connection(self.database) as conn:
+                if self.manager.dialect == "mysql":
+                    # Unbuffered: rows stay on the server until fetched, one chunk at a time
+                    cursor = conn.cursor(buffered=False)
+                    # The server gives up on a client that reads slower than this while it waits to send
+                    cursor.execute("SET SESSION net_write_timeout = 3600")
+                else:
+                    cursor = conn.cursor()
+                cursor.execute(query, params)
+                reported = time.monotonic()
+                while not self.cancelled.is_set():
+                    rows = cursor.fetchmany(self.chunk)
+                    if not rows:
+                        cursor.close()
+                        break
+                    sink.write(rows)
+                    self.rows += len(rows)
+                    if time.monotonic() - reported >= PROGRESS_INTERVAL:
+                        reported = time.monotonic()
+                        self.report(self.progress_text())
+            sink.close()
+        except BaseException:
+            sink.close()
+            os.remove(partial)
+            raise
+        if self.cancelled.is_set():
+            os.remove(partial)
+            return None
+        os.replace(partial, path)
+        return self.rows
+
+    def start(self, path, fmt=None, sensor_id=None, start=None, end=None):
+        # Runs on its own thread; on_progress gets text updates and then None once the export is over
+        self.cancelled.clear()
+        self.thread = threading.Thread(
+            target=self._run, args=(path, fmt, sensor_id, start, end), name="export", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self, path, fmt, sensor_id, start, end):
+        try:
+            rows = self.export(path, fmt, sensor_id, start, end)
+            if rows is None:
+                self.report(f"⏹️ Export cancelled after {self.rows:,} rows")
+            else:
+                self.report(f"✅ Exported {rows:,} rows to {os.path.basename(path)}")
+        except Exception as e:
+            self.report(f"❌ Export failed: {e}")
+        self.report(None)
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream sensor_readings to a CSV or Parquet file")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the --out extension")
+    parser.add_argument("--sensor")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="YYYY-MM-DD HH:MM:SS")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="YYYY-MM-DD HH:MM:SS")
+    parser.add_argument("--config", default="config.json", help="DB settings, as saved by the Configuration tab")
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--table", default=READINGS_TABLE)
+    parser.add_argument("--chunk", type=int)
+    args = parser.parse_args()
+
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r") as f:
+            config = json.load(f)
+    exporter = Exporter(
+        get_manager(config), args.database, args.table,
+        chunk=args.chunk or int(config.get("export_chunk", EXPORT_CHUNK)), on_progress=print,
+    )
+    rows = exporter.export(args.out, args.format, args.sensor and args.sensor.upper(), args.start, args.end)
+    print(f"Exported {rows} rows to {args.out}")
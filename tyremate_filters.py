@@ -0,0 +1,121 @@
+from collections import deque
+
+from tyremate_decode import MIN_FRAME_SIZE, unpack_frame
+
+FRAME_HEADER = 0xA0
+# Plausible decoded values. A zeroed field decodes to -15 PSI, -52 °C or 1.5 V, so those land outside;
+# pressure keeps a little room below 0 so a flat tyre still gets through
+PRESSURE_RANGE = (-1.0, 150.0)
+TEMPERATURE_RANGE = (-40, 125)
+VOLTAGE_RANGE = (1.8, 4.0)
+
+
+class DuplicateFilter:
+    def __init__(self, window=1.0, ring_size=8):
+        self.window = window
+        self.ring_size = ring_size
+        self.recent = {}
+        self.suppressed = {}
+        self.passed = 0
+
+    def is_duplicate(self, data, received_at):
+        if self.window <= 0 or len(data) < 3:
+            self.passed += 1
+            return False
+        # Bytes 1-2 carry the sensor ID, so the raw frame can be keyed before decoding
+        sensor_key = data[1:3]
+        ring = self.recent.get(sensor_key)
+        if ring is None:
+            ring = self.recent[sensor_key] = deque(maxlen=self.ring_size)
+        for frame, seen_at in ring:
+            if frame == data and received_at - seen_at <= self.window:
+                sensor_id = sensor_key.hex().upper()
+                self.suppressed[sensor_id] = self.suppressed.get(sensor_id, 0) + 1
+                return True
+        ring.append((data, received_at))
+        self.passed += 1
+        return False
+
+    def total_suppressed(self):
+        return sum(self.suppressed.values())
+
+    def stats(self):
+        return {
+            "window": self.window,
+            "passed": self.passed,
+            "suppressed": self.total_suppressed(),
+            "by_sensor": dict(self.suppressed),
+        }
+
+
+class FrameValidator:
+    def __init__(self, header=FRAME_HEADER, min_length=MIN_FRAME_SIZE, pressure=PRESSURE_RANGE,
+                 temperature=TEMPERATURE_RANGE, voltage=VOLTAGE_RANGE, on_reject=None):
+        self.header = header
+        self.min_length = min_length
+        # A range of None skips that check
+        self.ranges = tuple(
+            (name, limits) for name, limits in (("pressure", pressure), ("temperature", temperature), ("voltage", voltage))
+            if limits is not None
+        )
+        self.on_reject = on_reject
+        self.rejected = {}
+        self.passed = 0
+
+    @classmethod
+    def from_config(cls, config, on_reject=None):
+        if not config.get("validate_frames", True):
+            # Only frames too short to decode are turned away, e.g. to replay a raw capture as it was
+            return cls(header=None, pressure=None, temperature=None, voltage=None, on_reject=on_reject)
+        header = config.get("frame_header", "A0")
+        return cls(
+            header=int(header, 16) if header else None,
+            pressure=tuple(config.get("valid_pressure", PRESSURE_RANGE)),
+            temperature=tuple(config.get("valid_temperature", TEMPERATURE_RANGE)),
+            voltage=tuple(config.get("valid_voltage", VOLTAGE_RANGE)),
+            on_reject=on_reject,
+        )
+
+    def check_frame(self, data, received_at):
+        # Raw checks, before the frame is decoded or compared against recent frames
+        if len(data) < self.min_length:
+            return self.reject("short_frame", data, received_at)
+        if self.header is not None and data[0] != self.header:
+            return self.reject("bad_header", data, received_at)
+        return True
+
+    def check_reading(self, reading):
+        for name, (low, high) in self.ranges:
+            if not low <= getattr(reading, name) <= high:
+                return self.reject(f"{name}_range", reading.raw, reading.received_at)
+        self.passed += 1
+        return True
+
+    def accepts(self, data):
+        # The same checks without counting or quarantining anything, e.g. to vet a replay file up front
+        if len(data) < self.min_length or (self.header is not None and data[0] != self.header):
+            return False
+        reading = unpack_frame(data)
+        return all(low <= getattr(reading, name) <= high for name, (low, high) in self.ranges)
+
+    def reject(self, reason, data, received_at):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if self.on_reject:
+            self.on_reject(reason, data, received_at)
+        return False
+
+    def total_rejected(self):
+        return sum(self.rejected.values())
+
+    def summary(self):
+        if not self.rejected:
+            return "🚫 0 rejected"
+        reasons = ", ".join(f"{reason} {count}" for reason, count in sorted(self.rejected.items()))
+        return f"🚫 {self.total_rejected()} rejected ({reasons})"
+
+    def stats(self):
+        return {
+            "passed": self.passed,
+            "rejected": self.total_rejected(),
+            "by_reason": dict(self.rejected),
+        }
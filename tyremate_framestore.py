@@ -0,0 +1,302 @@
+import argparse
+import bisect
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from tyremate_decode import FRAME_SIZE, load_numpy, unpack_frame
+
+FRAME_DIR = "frames"
+SEGMENT_RECORDS = 1_000_000
+INDEX_FLUSH_INTERVAL = 5.0
+# Little-endian receive time (epoch seconds) followed by the raw 20-byte frame
+RECORD = struct.Struct(f"<d{FRAME_SIZE}s")
+RECORD_SIZE = RECORD.size
+TIME = struct.Struct("<d")
+
+
+def segment_name(number):
+    return f"segment-{number:06d}.bin"
+
+
+class SegmentIndex:
+    def __init__(self, count=0, first_ts=None, last_ts=None, sensors=None):
+        self.count = count
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        # sensor_id -> [records, first_ts, last_ts]
+        self.sensors = sensors or {}
+
+    def add(self, received_at, sensor_id):
+        if self.first_ts is None:
+            self.first_ts = received_at
+        self.last_ts = received_at
+        self.count += 1
+        entry = self.sensors.get(sensor_id)
+        if entry is None:
+            self.sensors[sensor_id] = [1, received_at, received_at]
+        else:
+            entry[0] += 1
+            entry[2] = received_at
+
+    def overlaps(self, start=None, end=None, sensor_id=None):
+        if not self.count:
+            return False
+        first, last = self.first_ts, self.last_ts
+        if sensor_id is not None:
+            entry = self.sensors.get(sensor_id)
+            if entry is None:
+                return False
+            first, last = entry[1], entry[2]
+        return (start is None or last >= start) and (end is None or first <= end)
+
+    def to_json(self):
+        return {"count": self.count, "first_ts": self.first_ts, "last_ts": self.last_ts, "sensors": self.sensors}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["count"], data["first_ts"], data["last_ts"], data["sensors"])
+
+
+class FrameStore:
+    def __init__(self, directory=FRAME_DIR, segment_records=SEGMENT_RECORDS, flush_interval=INDEX_FLUSH_INTERVAL):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment = None
+        self._index = None
+        self._flushed_at = time.monotonic()
+        self.frames_written = 0
+
+    def segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.bin")))
+
+    def index_path(self, segment_path):
+        return segment_path[:-4] + ".idx"
+
+    def load_index(self, segment_path):
+        try:
+            with open(self.index_path(segment_path), "r") as f:
+                index = SegmentIndex.from_json(json.load(f))
+            # An exit without close() leaves frames in the segment that the saved index never saw
+            if index.count == os.path.getsize(segment_path) // RECORD_SIZE:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        index = self.rebuild_index(segment_path)
+        if segment_path != self._segment:
+            self._write_index(segment_path, index)
+        return index
+
+    def rebuild_index(self, segment_path):
+        # Missing or stale index (e.g. after a crash): one pass over the mmap restores it
+        index = SegmentIndex()
+        for received_at, frame in self._scan_segment(segment_path):
+            index.add(received_at, f"{frame[1]:02X}{frame[2]:02X}")
+        return index
+
+    def _write_index(self, segment_path, index):
+        try:
+            with open(self.index_path(segment_path), "w") as f:
+                json.dump(index.to_json(), f)
+        except OSError:
+            pass
+
+    def _save_index(self):
+        if self._segment is not None:
+            self._write_index(self._segment, self._index)
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        paths = self.segment_paths()
+        if paths:
+            last = paths[-1]
+            index = self.load_index(last)
+            if index.count < self.segment_records and os.path.getsize(last) == index.count * RECORD_SIZE:
+                self._segment, self._index = last, index
+                self._file = open(last, "ab")
+                return
+            number = int(os.path.basename(last)[8:14]) + 1
+        else:
+            number = 1
+        self._segment = os.path.join(self.directory, segment_name(number))
+        self._index = SegmentIndex()
+        self._file = open(self._segment, "ab")
+
+    def append(self, received_at, frame):
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            elif self._index.count >= self.segment_records:
+                self._close_segment()
+                self._open_segment()
+            frame = bytes(frame[:FRAME_SIZE]).ljust(FRAME_SIZE, b"\0")
+            self._file.write(RECORD.pack(received_at, frame))
+            self._index.add(received_at, f"{frame[1]:02X}{frame[2]:02X}")
+            self.frames_written += 1
+            # Bounds what a crash can leave unindexed; load_index rebuilds whatever is still missing
+            if time.monotonic() - self._flushed_at >= self.flush_interval:
+                self._flush()
+
+    def _flush(self):
+        self._flushed_at = time.monotonic()
+        if self._file is not None:
+            self._file.flush()
+            self._save_index()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _close_segment(self):
+        self._file.close()
+        self._save_index()
+        self._file = None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._close_segment()
+                self._segment = None
+
+    def _scan_segment(self, segment_path, start=None, end=None, sensor_bytes=None):
+        size = os.path.getsize(segment_path)
+        count = size // RECORD_SIZE
+        if not count:
+            return
+        with open(segment_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = 0
+            if start is not None:
+                # Records are appended in receive order, so the start offset is a binary search
+                times = _TimeColumn(mm, count)
+                first = bisect.bisect_left(times, start)
+            for i in range(first, count):
+                offset = i * RECORD_SIZE
+                received_at = TIME.unpack_from(mm, offset)[0]
+                if end is not None and received_at > end:
+                    break
+                frame_offset = offset + TIME.size
+                if sensor_bytes is not None and mm[frame_offset + 1:frame_offset + 3] != sensor_bytes:
+                    continue
+                yield received_at, mm[frame_offset:frame_offset + FRAME_SIZE]
+
+    def scan(self, start=None, end=None, sensor_id=None):
+        self.flush()
+        sensor_bytes = bytes.fromhex(sensor_id) if sensor_id else None
+        for path in self.segment_paths():
+            if not self.load_index(path).overlaps(start, end, sensor_id):
+                continue
+            yield from self._scan_segment(path, start, end, sensor_bytes)
+
+    def count(self, start=None, end=None, sensor_id=None):
+        if start is None and end is None:
+            indexes = [self.load_index(path) for path in self.segment_paths()]
+            if sensor_id is None:
+                return sum(index.count for index in indexes)
+            return sum(index.sensors.get(sensor_id, [0])[0] for index in indexes)
+        return sum(1 for _ in self.scan(start, end, sensor_id))
+
+    def arrays(self):
+        # Zero-copy NumPy views, one per segment, for bulk analysis with tyremate_decode.unpack_frames
+        try:
+            np = load_numpy()
+        except ImportError:
+            raise ImportError("numpy is required for array reads")
+        self.flush()
+        dtype = np.dtype([("received_at", "<f8"), ("frame", "u1", (FRAME_SIZE,))])
+        for path in self.segment_paths():
+            if os.path.getsize(path) >= RECORD_SIZE:
+                yield np.memmap(path, dtype=dtype, mode="r")
+
+    def view(self):
+        self.flush()
+        return FrameView(self.segment_paths())
+
+    def export_csv(self, out_path, start=None, end=None, sensor_id=None):
+        written = 0
+        with open(out_path, "w") as out:
+            out.write("Timestamp,Sensor ID,Pressure (PSI),Temperature (°C),Voltage (V),Raw Data\n")
+            for received_at, frame in self.scan(start, end, sensor_id):
+                r = unpack_frame(frame, received_at)
+                out.write(f"{r.timestamp.strftime('%Y-%m-%d %H:%M:%S')},{r.sensor_id},{r.pressure},"
+                          f"{r.temperature},{r.voltage},{r.raw_hex}\n")
+                written += 1
+        return written
+
+
+class _TimeColumn:
+    # Sequence view of the timestamp column so bisect can search the mmap directly
+    def __init__(self, mm, count):
+        self.mm = mm
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return TIME.unpack_from(self.mm, i * RECORD_SIZE)[0]
+
+
+class FrameView:
+    # Indexable over every stored frame without loading them, e.g. as a ReplaySource frame list
+    def __init__(self, segment_paths):
+        self.segments = []
+        self.offsets = []
+        total = 0
+        for path in segment_paths:
+            count = os.path.getsize(path) // RECORD_SIZE
+            if not count:
+                continue
+            f = open(path, "rb")
+            self.segments.append((f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)))
+            self.offsets.append(total)
+            total += count
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        segment = bisect.bisect_right(self.offsets, i) - 1
+        offset = (i - self.offsets[segment]) * RECORD_SIZE + TIME.size
+        return self.segments[segment][1][offset:offset + FRAME_SIZE]
+
+    def close(self):
+        for f, mm in self.segments:
+            mm.close()
+            f.close()
+        self.segments = []
+
+
+def parse_time(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp() if text else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export the binary frame store")
+    parser.add_argument("command", choices=("stats", "export"))
+    parser.add_argument("--dir", default=FRAME_DIR)
+    parser.add_argument("--sensor")
+    parser.add_argument("--start", help="YYYY-MM-DD HH:MM:SS")
+    parser.add_argument("--end", help="YYYY-MM-DD HH:MM:SS")
+    parser.add_argument("--out", default="frames_export.csv")
+    args = parser.parse_args()
+
+    store = FrameStore(args.dir)
+    if args.command == "stats":
+        for path in store.segment_paths():
+            index = store.load_index(path)
+            print(f"{os.path.basename(path)}: {index.count} frames, {len(index.sensors)} sensors")
+        print(f"total: {store.count(sensor_id=args.sensor)} frames")
+    else:
+        rows = store.export_csv(args.out, parse_time(args.start), parse_time(args.end), args.sensor)
+        print(f"Exported {rows} frames to {args.out}")
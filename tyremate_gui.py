@@ -1,15 +1,20 @@
 import tkinter as tk
 from tkinter import ttk
-import mysql.connector
+from tyremate_db import DEFAULT_DATABASE, READINGS_TABLE, get_manager, migrate_schema
+from tyremate_viewer import TableViewer
+from tyremate_retention import Retention
 import json
 import os
+import queue
 
 CONFIG_FILE = "config.json"
 
 class TyremateGUI:
-    def __init__(self, root, start_callback=None):
+    def __init__(self, root, start_callback=None, open_buckets=None):
         self.root = root
         self.start_callback = start_callback
+        # open_buckets(resolution) -> rollup buckets the running scan has not written yet
+        self.open_buckets = open_buckets
 
         if isinstance(self.root, tk.Tk):
             self.root.title("Configuration")
@@ -153,16 +158,20 @@ class TyremateGUI:
         self.pass_var.set("")
         self.output.config(text="🔁 DB fields set to default.")
 
+    def db_manager(self):
+        settings = {k: v for k, v in self.prev_config.items() if k.startswith("db_")}
+        settings.update({
+            "host": self.host_var.get(),
+            "port": self.port_var.get() or 3307,
+            "user": self.user_var.get(),
+            "password": self.pass_var.get(),
+        })
+        return get_manager(settings)
+
     def test_db_connection(self):
         try:
-            conn = mysql.connector.connect(
-                host=self.host_var.get(),
-                port=int(self.port_var.get() or 3307),
-                user=self.user_var.get(),
-                password=self.pass_var.get(),
-                database="tyremate_data"
-            )
-            conn.close()
+            with self.db_manager().connection("tyremate_data"):
+                pass
             self.db_status_msg.set("\u2705 Connected")
             self.table_frame.grid()
         except Exception as e:
@@ -173,28 +182,8 @@ class TyremateGUI:
         db_name = self.dbname_var.get()
         table_name = self.tablename_var.get()
         try:
-            conn = mysql.connector.connect(
-                host=self.host_var.get(),
-                port=int(self.port_var.get() or 3307),
-                user=self.user_var.get(),
-                password=self.pass_var.get(),
-                database=db_name
-            )
-            cursor = conn.cursor()
-            create_query = f"""
-            CREATE TABLE IF NOT EXISTS `{table_name}` (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                sensor_id VARCHAR(20),
-                pressure FLOAT,
-                temperature FLOAT,
-                battery FLOAT,
-                raw_data TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-            cursor.execute(create_query)
-            conn.commit()
-            conn.close()
+            # Same schema and indexes the scan tab writes to; older tables are migrated in place
+            migrate_schema(self.db_manager(), db_name, table_name)
             self.output.config(text=f"✅ Table `{table_name}` created in `{db_name}`.")
             self.table_frame.grid_remove()
             self.table_status_msg.set(f"✅ Table '{table_name}' created successfully.")
@@ -210,7 +199,7 @@ class TyremateGUI:
 
         popup = tk.Toplevel(self.root)
         popup.title("Confirm Deletion")
-        popup.geometry("340x280")
+        popup.geometry("340x310")
         popup.resizable(False, False)
 
         ttk.Label(popup, text="🧹 Select what you want to delete:", font=("Segoe UI", 11)).pack(pady=10)
@@ -225,46 +214,25 @@ class TyremateGUI:
         for text, value in options:
             ttk.Radiobutton(popup, text=text, variable=delete_choice, value=value).pack(anchor="w", padx=30, pady=2)
 
+        # Rollups and alert history are kept unless asked for, so trends survive clearing the raw rows
+        delete_derived = tk.BooleanVar(value=False)
+        ttk.Checkbutton(popup, text="📈 Also delete rollups & alert history", variable=delete_derived).pack(anchor="w", padx=30, pady=(8, 2))
+
         def confirm_and_delete():
             choice = delete_choice.get()
-            messages = []
-
+            # Deletion runs on the retention thread; progress comes back through a queue polled here
+            progress = queue.Queue()
+            retention = Retention(self.db_manager(), on_progress=progress.put)
             if choice in ("all", "db"):
-                try:
-                    conn = mysql.connector.connect(
-                        host=self.host_var.get(),
-                        port=int(self.port_var.get()),
-                        user=self.user_var.get(),
-                        password=self.pass_var.get(),
-                        database="tyremate_data"
-                    )
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM sensor_readings")
-                    conn.commit()
-                    conn.close()
-                    messages.append("DB rows deleted")
-                except Exception as e:
-                    messages.append(f"DB deletion failed: {e}")
-
+                retention.submit(retention.clear_rows, delete_derived.get())
             if choice in ("all", "log"):
-                try:
-                    if os.path.exists("tyremate_log.txt"):
-                        open("tyremate_log.txt", "w").close()
-                    messages.append("Log file cleared")
-                except Exception as e:
-                    messages.append(f"Log clear failed: {e}")
-
+                retention.submit(retention.clear_log)
             if choice in ("all", "qr"):
-                try:
-                    qr_folder = "qr_codes"
-                    if os.path.exists(qr_folder):
-                        for filename in os.listdir(qr_folder):
-                            os.remove(os.path.join(qr_folder, filename))
-                    messages.append("QR codes deleted")
-                except Exception as e:
-                    messages.append(f"QR delete failed: {e}")
-
-            self.output.config(text="✅ " + ", ".join(messages))
+                retention.submit(retention.clear_qr)
+            retention.submit(progress.put, None)
+            retention.close(timeout=0)
+            self.output.config(text="🧹 Deleting...")
+            self.poll_deletion(progress, [])
             popup.destroy()
 
         button_frame = ttk.Frame(popup)
@@ -273,39 +241,35 @@ class TyremateGUI:
         ttk.Button(button_frame, text="✅ Yes", command=confirm_and_delete).grid(row=0, column=0, padx=10)
         ttk.Button(button_frame, text="❌ Cancel", command=popup.destroy).grid(row=0, column=1, padx=10)
 
+    def poll_deletion(self, progress, messages):
+        try:
+            while True:
+                text = progress.get_nowait()
+                if text is None:
+                    self.output.config(text=", ".join(messages))
+                    return
+                if text.startswith(("✅", "❌")):
+                    messages.append(text)
+                else:
+                    self.output.config(text=text)
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_deletion, progress, messages)
+
     def view_table(self):
-        db_name = self.dbname_var.get()
-        table_name = self.tablename_var.get()
+        # Pages are fetched by id on a worker thread, so large tables open instantly
+        db_name, table_name = self.dbname_var.get(), self.tablename_var.get()
+        # The scan tab only ever writes the default table, so its open buckets belong to no other
+        live = db_name == DEFAULT_DATABASE and table_name == READINGS_TABLE
         try:
-            conn = mysql.connector.connect(
-                host=self.host_var.get(),
-                port=int(self.port_var.get() or 3307),
-                user=self.user_var.get(),
-                password=self.pass_var.get(),
-                database=db_name
+            TableViewer(
+                self.root, self.db_manager(), db_name, table_name,
+                page_size=int(self.prev_config.get("viewer_page_size", 200)),
+                export_chunk=int(self.prev_config.get("export_chunk", 10000)),
+                open_buckets=self.open_buckets if live else None,
             )
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM `{table_name}`")
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            conn.close()
         except Exception as e:
             self.output.config(text=f"❌ View failed: {e}")
-            return
-
-        view_window = tk.Toplevel(self.root)
-        view_window.title(f"{table_name} in {db_name}")
-        view_window.geometry("700x400")
-
-        tree = ttk.Treeview(view_window, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        for row in rows:
-            tree.insert("", "end", values=row)
-
-        tree.pack(fill="both", expand=True)
-        ttk.Button(view_window, text="Close", command=view_window.destroy).pack(pady=10)
 
     def load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -317,7 +281,9 @@ class TyremateGUI:
         return {}
 
     def launch_main_gui(self):
-        config = {
+        # Start from the saved file so tuning keys without a widget survive a save
+        config = dict(self.prev_config)
+        config.update({
             "host": self.host_var.get() if self.db_enabled.get() else "",
             "port": self.port_var.get() if self.db_enabled.get() else "",
             "user": self.user_var.get() if self.db_enabled.get() else "",
@@ -325,7 +291,7 @@ class TyremateGUI:
             "log_enabled": self.log_enabled.get(),
             "separator": self.separator.get(),
             "fields": {k: v.get() for k, v in self.fields.items()}
-        }
+        })
         try:
             with open(CONFIG_FILE, "w") as f:
                 json.dump(config, f, indent=4)
@@ -0,0 +1,204 @@
+import glob
+import gzip
+import locale
+import os
+import shutil
+import threading
+from datetime import date, datetime
+
+LOG_HEADER = "Timestamp,Sensor ID,Pressure (PSI),Temperature (°C),Voltage (V),Raw Data\n"
+TAIL_BLOCK = 8192
+
+# Absolute path -> the LogAppender holding that file open, so other code can clear it through the appender
+_open_appenders = {}
+
+
+class LogAppender:
+    def __init__(self, path, header=LOG_HEADER, flush_interval=1.0, flush_bytes=64 * 1024,
+                 max_bytes=10 * 1024 * 1024, rotate_daily=True, compress=True, backups=14):
+        self.path = path
+        self.header = header
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.backups = backups
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._opened_on = None
+        self._size = 0
+        self._unflushed = 0
+        self._wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+        self.lines_written = 0
+        self.flushes = 0
+        self.rotations = 0
+
+    def open(self):
+        # Safe to call from several threads: only the first call opens the file and starts the flusher
+        with self._lock:
+            if self.running:
+                return
+            self._open()
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name="log-appender", daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        created = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        # One long-lived handle with a large buffer instead of open/append/close per reading
+        self._file = open(self.path, "a", buffering=self.flush_bytes)
+        _open_appenders[os.path.abspath(self.path)] = self
+        if created and self.header:
+            self._file.write(self.header)
+        self._size = self._file.tell()
+        self._opened_on = date.today()
+        return created
+
+    def write(self, line):
+        with self._lock:
+            if self._file is None:
+                self._open()
+            if self._needs_rotation():
+                self._rotate()
+            self._file.write(line)
+            # Readings are ASCII, so characters are a close enough stand-in for bytes
+            self._size += len(line)
+            self._unflushed += len(line)
+            self.lines_written += 1
+            if self._unflushed >= self.flush_bytes:
+                self._flush()
+
+    def _needs_rotation(self):
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return self.rotate_daily and self._opened_on != date.today()
+
+    def _rotate(self):
+        self._file.close()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        stem, ext = os.path.splitext(self.path)
+        rotated = f"{stem}.{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{stem}.{stamp}-{suffix}{ext}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        self.rotations += 1
+        self._open()
+        self._unflushed = 0
+        if self.compress:
+            # gzip off the writer's path so a rotation never stalls incoming readings
+            threading.Thread(target=self._compress, args=(rotated,), daemon=True).start()
+        else:
+            self._prune()
+
+    def _compress(self, rotated):
+        try:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        except OSError:
+            pass
+        self._prune()
+
+    def rotated_files(self):
+        stem, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(stem)}.*{ext}*"), key=os.path.getmtime)
+
+    def _prune(self):
+        if not self.backups:
+            return
+        try:
+            rotated = self.rotated_files()
+        except OSError:
+            # Another compression thread renamed a file mid-listing; the next rotation prunes
+            return
+        for old in rotated[:-self.backups]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _flush(self):
+        if self._file is not None and self._unflushed:
+            self._file.flush()
+            self._unflushed = 0
+            self.flushes += 1
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def truncate(self):
+        # Under the writer's lock, so no line lands half in the old contents and the size that drives
+        # rotation starts again from the header
+        with self._lock:
+            if self._file is None:
+                if os.path.exists(self.path):
+                    open(self.path, "w").close()
+                return
+            self._flush()
+            self._file.seek(0)
+            self._file.truncate()
+            if self.header:
+                self._file.write(self.header)
+            self._file.flush()
+            self._size = self._file.tell()
+            self._unflushed = 0
+
+    def _run(self):
+        while self.running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join(2.0)
+            self.thread = None
+        with self._lock:
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if _open_appenders.get(os.path.abspath(self.path)) is self:
+                del _open_appenders[os.path.abspath(self.path)]
+
+    def stats(self):
+        return {
+            "lines_written": self.lines_written,
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+            "size": self._size,
+        }
+
+
+def truncate_log(path):
+    # A live appender clears the file itself; writing around it would leave its buffer and size stale
+    appender = _open_appenders.get(os.path.abspath(path))
+    if appender is not None:
+        appender.truncate()
+    elif os.path.exists(path):
+        open(path, "w").close()
+
+
+def tail_lines(path, count=500):
+    # Read backwards in blocks so memory depends on the lines requested, not the file size
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode(locale.getpreferredencoding(False), errors="replace").splitlines()
+    return lines[-count:]
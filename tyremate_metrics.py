@@ -0,0 +1,251 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKETS = 64
+# Microsecond values up to ~2^26 (about a minute) keep ~1.5% precision; anything slower lands in the last bucket
+BUCKETS = 2 * SUB_BUCKETS + 20 * SUB_BUCKETS
+RATE_WINDOW = 10
+
+
+def bucket_index(value):
+    # HDR-style log-linear layout: exact below 128 µs, then 64 linear sub-buckets per power of two
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - 7
+    return min(2 * SUB_BUCKETS + (shift - 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS, BUCKETS - 1)
+
+
+def bucket_value(index):
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = (index - 2 * SUB_BUCKETS) // SUB_BUCKETS + 1
+    mantissa = (index - 2 * SUB_BUCKETS) % SUB_BUCKETS + SUB_BUCKETS
+    # Middle of the bucket's range
+    return (mantissa << shift) + (1 << (shift - 1))
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        # Microseconds
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * pct / 100)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(bucket_value(index), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count if self.count else 0.0,
+            "min_us": self.min or 0,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "max_us": self.max,
+        }
+
+
+class RateCounter:
+    __slots__ = ("total", "slots", "current_second", "current")
+
+    def __init__(self):
+        self.total = 0
+        self.slots = deque(maxlen=RATE_WINDOW)
+        self.current_second = int(time.monotonic())
+        self.current = 0
+
+    def mark(self, now, n=1):
+        second = int(now)
+        if second != self.current_second:
+            self.slots.append(self.current)
+            # Seconds with no events still count towards the window
+            for _ in range(min(second - self.current_second - 1, RATE_WINDOW)):
+                self.slots.append(0)
+            self.current_second = second
+            self.current = 0
+        self.current += n
+        self.total += n
+
+    def rate(self, now):
+        # Events per second over the last RATE_WINDOW complete seconds
+        self.mark(now, 0)
+        return sum(self.slots) / len(self.slots) if self.slots else float(self.current)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.sensors = {}
+        # counter -> (label, {label value: count}), e.g. rejected frames by reason
+        self.counters = {}
+        self.started_at = time.time()
+
+    def _entry(self, table, key):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = (LatencyHistogram(), RateCounter())
+        return entry
+
+    def observe(self, stage, seconds, sensor_id=None):
+        now = time.monotonic()
+        with self._lock:
+            histogram, rate = self._entry(self.stages, stage)
+            histogram.record(seconds)
+            rate.mark(now)
+            if sensor_id is not None:
+                histogram, rate = self._entry(self.sensors, sensor_id)
+                histogram.record(seconds)
+                rate.mark(now)
+
+    def count(self, counter, label, value, n=1):
+        with self._lock:
+            entry = self.counters.get(counter)
+            if entry is None:
+                entry = self.counters[counter] = (label, {})
+            entry[1][value] = entry[1].get(value, 0) + n
+
+    def timed(self, stage, fn):
+        # Wraps a bound method; the wrapper is installed in its place so call sites stay unchanged
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(stage, perf_counter() - started)
+        return wrapper
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started_at,
+                "stages": {name: dict(h.summary(), rate=r.rate(now), total=r.total)
+                           for name, (h, r) in self.stages.items()},
+                "sensors": {name: dict(h.summary(), rate=r.rate(now), total=r.total)
+                            for name, (h, r) in self.sensors.items()},
+                "counters": {name: {label: dict(values)} for name, (label, values) in self.counters.items()},
+            }
+
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines = []
+        for kind, label in (("stages", "stage"), ("sensors", "sensor")):
+            metric = f"tyremate_{label}"
+            lines.append(f"# TYPE {metric}_latency_seconds summary")
+            lines.append(f"# TYPE {metric}_events_total counter")
+            lines.append(f"# TYPE {metric}_rate gauge")
+            for name, s in sorted(snap[kind].items()):
+                for q, key in (("0.5", "p50_us"), ("0.9", "p90_us"), ("0.99", "p99_us"), ("0.999", "p999_us")):
+                    lines.append(f'{metric}_latency_seconds{{{label}="{name}",quantile="{q}"}} {s[key] / 1e6:.6f}')
+                lines.append(f'{metric}_latency_seconds_sum{{{label}="{name}"}} {s["mean_us"] * s["count"] / 1e6:.6f}')
+                lines.append(f'{metric}_latency_seconds_count{{{label}="{name}"}} {s["count"]}')
+                lines.append(f'{metric}_events_total{{{label}="{name}"}} {s["total"]}')
+                lines.append(f'{metric}_rate{{{label}="{name}"}} {s["rate"]:.3f}')
+        for name, by_label in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE tyremate_{name}_total counter")
+            for label, values in by_label.items():
+                for value, count in sorted(values.items()):
+                    lines.append(f'tyremate_{name}_total{{{label}="{value}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def table(self, rows=None):
+        snap = self.snapshot()["stages"]
+        lines = [f"{'stage':<12}{'rate/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for name in rows or sorted(snap):
+            s = snap.get(name)
+            if s is None:
+                continue
+            lines.append(f"{name:<12}{s['rate']:>9.1f}{s['p50_us'] / 1000:>9.2f}"
+                         f"{s['p99_us'] / 1000:>9.2f}{s['max_us'] / 1000:>9.2f}")
+        return "\n".join(lines)
+
+
+class MetricsExporter:
+    def __init__(self, metrics, path=None, interval=10.0, port=None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self._stop = threading.Event()
+        self.thread = None
+        self.server = None
+
+    def start(self):
+        if self.path:
+            self.thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+            self.thread.start()
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = metrics.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            # Loopback only: the endpoint is for a local Prometheus or curl, not the network
+            self.server = ThreadingHTTPServer(("127.0.0.1", int(self.port)), Handler)
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def export(self):
+        # .prom files get Prometheus text (node_exporter textfile format), anything else JSON
+        if self.path.endswith(".prom"):
+            text = self.metrics.to_prometheus()
+        else:
+            text = json.dumps(self.metrics.snapshot(), indent=2)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+    def stop(self):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(2.0)
+            self.thread = None
+            self.export()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
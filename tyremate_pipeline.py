@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+_STOP = object()
+
+
+class PipelineStage:
+    def __init__(self, name, handler, maxsize=1000, drop_policy=DROP_OLDEST, block_timeout=0.5):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.handler = handler
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.downstream = []
+        self.thread = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.high_water = 0
+        self.last_error = None
+
+    def connect(self, *stages):
+        self.downstream.extend(stages)
+        return self
+
+    def put(self, item):
+        if self.drop_policy == BLOCK and self.block_timeout:
+            # Waits for room outside the lock, so other producers are never held up behind this one
+            try:
+                self.queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return False
+            with self._lock:
+                self._count_put()
+            return True
+        with self._lock:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                # drop_newest, and block with no timeout, refuse the new item
+                if self.drop_policy != DROP_OLDEST:
+                    return False
+                # drop_oldest: evict the head so the freshest frame wins
+                try:
+                    evicted = self.queue.get_nowait()
+                except queue.Empty:
+                    evicted = None
+                if evicted is _STOP:
+                    # The shutdown sentinel is never evicted: it goes back in and the new item is dropped
+                    self.queue.put_nowait(_STOP)
+                    return False
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    return False
+            self._count_put()
+            return True
+
+    def _count_put(self):
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.high_water:
+            self.high_water = depth
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0, drain=True):
+        if not self.thread:
+            return
+        if not drain:
+            self.discard_pending()
+        # The sentinel bypasses the drop policy so shutdown never loses it
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def discard_pending(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                continue
+            self.processed += 1
+            if result is not None:
+                for stage in self.downstream:
+                    stage.put(result)
+
+    def stats(self):
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "high_water": self.high_water,
+        }
+
+
+class IngestPipeline:
+    def __init__(self, decode, persist, qr, ui, maxsize=1000, drop_policy=DROP_OLDEST):
+        # Intake is fed from the BLE callback on the event loop, so it never waits for room, whatever the policy
+        self.decode_stage = PipelineStage("decode", decode, maxsize, drop_policy, block_timeout=0)
+        self.persist_stage = PipelineStage("persist", persist, maxsize, drop_policy)
+        self.qr_stage = PipelineStage("qr", qr, maxsize, drop_policy)
+        self.ui_stage = PipelineStage("ui", ui, maxsize, drop_policy)
+        self.decode_stage.connect(self.persist_stage, self.qr_stage, self.ui_stage)
+        self.stages = [self.decode_stage, self.persist_stage, self.qr_stage, self.ui_stage]
+        self.running = False
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        self.running = True
+
+    def submit(self, data):
+        # Called on the BLE thread: copy the frame, stamp it and get out
+        return self.decode_stage.put((time.time(), bytes(data)))
+
+    def stop(self, timeout=2.0):
+        self.running = False
+        # Stop upstream first so persist drains what was already decoded;
+        # QR and UI work for a closing window is not worth waiting for
+        self.decode_stage.stop(timeout)
+        self.persist_stage.stop(timeout)
+        self.qr_stage.stop(timeout, drain=False)
+        self.ui_stage.stop(timeout, drain=False)
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def summary(self):
+        parts = []
+        for stage in self.stages:
+            s = stage.stats()
+            parts.append(f"{stage.name} {s['depth']}/{s['capacity']} drop {s['dropped']}")
+        return " | ".join(parts)
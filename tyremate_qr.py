@@ -0,0 +1,177 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+
+QR_DIR = "qr_codes"
+PREVIEW_SIZE = (200, 200)
+
+
+def build_formatter(fields, separator):
+    # Resolve the enabled fields once instead of re-checking the config on every frame
+    getters = []
+    if fields.get("pressure"):
+        getters.append(lambda r: str(r.pressure))
+    if fields.get("temperature"):
+        getters.append(lambda r: str(r.temperature))
+    if fields.get("battery"):
+        getters.append(lambda r: str(r.voltage))
+    if fields.get("datetime"):
+        getters.append(lambda r: r.timestamp.strftime("%Y-%m-%d %H:%M:%S"))
+    if fields.get("raw"):
+        getters.append(lambda r: r.raw_hex)
+
+    def format_payload(sensor_data, sensor_id):
+        return separator.join([sensor_id] + [get(sensor_data) for get in getters])
+
+    return format_payload
+
+
+def render_qr_bytes(payload, preview_size=PREVIEW_SIZE):
+    # Runs in a worker process: only plain bytes cross back to the app
+    import qrcode
+    image = qrcode.make(payload).get_image()
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    preview = image.resize(preview_size)
+    return buf.getvalue(), preview.mode, preview.size, preview.tobytes()
+
+
+class QRImage:
+    __slots__ = ("payload", "image", "_preview", "_png", "_preview_raw")
+
+    def __init__(self, payload, image=None, preview=None, png=None, preview_raw=None):
+        self.payload = payload
+        self.image = image
+        self._preview = preview
+        self._png = png
+        self._preview_raw = preview_raw
+
+    @classmethod
+    def from_bytes(cls, payload, rendered):
+        png, mode, size, data = rendered
+        return cls(payload, png=png, preview_raw=(mode, size, data))
+
+    @property
+    def preview(self):
+        if self._preview is None:
+            from PIL import Image
+            mode, size, data = self._preview_raw
+            self._preview = Image.frombytes(mode, size, data)
+        return self._preview
+
+    @property
+    def png(self):
+        if self._png is None:
+            buf = io.BytesIO()
+            self.image.save(buf, format="PNG")
+            self._png = buf.getvalue()
+        return self._png
+
+
+class QRRenderer:
+    def __init__(self, fields, separator, cache_size=128, preview_size=PREVIEW_SIZE, workers=0):
+        self.format_payload = build_formatter(fields, separator)
+        self.cache_size = cache_size
+        self.preview_size = preview_size
+        self._cache = OrderedDict()
+        self._saved = {}
+        self._lock = threading.Lock()
+
+        self.executor = None
+        self._inflight = None
+        if workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            # Bound outstanding jobs so a slow pool pushes back on the QR stage queue
+            self._inflight = threading.BoundedSemaphore(workers * 2)
+
+        self.hits = 0
+        self.misses = 0
+        self.offloaded = 0
+        self.writes = 0
+        self.skipped_writes = 0
+
+    def payload(self, sensor_data, sensor_id):
+        return self.format_payload(sensor_data, sensor_id)
+
+    def _cached(self, payload):
+        with self._lock:
+            entry = self._cache.get(payload)
+            if entry is not None:
+                self._cache.move_to_end(payload)
+                self.hits += 1
+            return entry
+
+    def _store(self, entry):
+        with self._lock:
+            self.misses += 1
+            self._cache[entry.payload] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def render(self, payload):
+        entry = self._cached(payload)
+        if entry is not None:
+            return entry
+        # qrcode and PIL load with the first QR code rather than at startup
+        import qrcode
+        image = qrcode.make(payload).get_image()
+        return self._store(QRImage(payload, image, image.resize(self.preview_size)))
+
+    def submit(self, payload, callback):
+        # callback(entry, error) runs inline, or on the pool's result thread when offloaded
+        entry = self._cached(payload)
+        if entry is not None or self.executor is None:
+            try:
+                entry = entry or self.render(payload)
+            except Exception as e:
+                callback(None, e)
+                return
+            callback(entry, None)
+            return
+        self._inflight.acquire()
+        self.offloaded += 1
+        future = self.executor.submit(render_qr_bytes, payload, self.preview_size)
+        future.add_done_callback(lambda f: self._on_rendered(payload, f, callback))
+
+    def _on_rendered(self, payload, future, callback):
+        self._inflight.release()
+        try:
+            entry = self._store(QRImage.from_bytes(payload, future.result()))
+        except Exception as e:
+            callback(None, e)
+            return
+        callback(entry, None)
+
+    def save_if_changed(self, path, entry):
+        # Repeated frames map to the same file and payload, so the PNG on disk is already current,
+        # unless retention or "Delete Previous Readings" removed it since
+        if self._saved.get(path) == entry.payload and os.path.exists(path):
+            self.skipped_writes += 1
+            return False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(entry.png)
+        self._saved[path] = entry.payload
+        self.writes += 1
+        return True
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "offloaded": self.offloaded,
+            "writes": self.writes,
+            "skipped_writes": self.skipped_writes,
+        }
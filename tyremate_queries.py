@@ -0,0 +1,227 @@
+from datetime import datetime
+
+from tyremate_db import DEFAULT_DATABASE, READINGS_TABLE, alert_table, quote, rollup_table
+from tyremate_rollup import RESOLUTIONS, pick_resolution
+
+READING_COLUMNS = "id, timestamp, sensor_id, pressure_psi, temperature, voltage, raw_data, qr_code_path"
+# history() rows: sensor_id, time, readings, then min/max/mean of pressure, temperature and voltage
+RAW_HISTORY_COLUMNS = ("sensor_id, timestamp, 1, pressure_psi, pressure_psi, pressure_psi, "
+                       "temperature, temperature, temperature, voltage, voltage, voltage")
+ROLLUP_HISTORY_COLUMNS = ("sensor_id, bucket_start, readings, "
+                          "pressure_min, pressure_max, pressure_sum / readings, "
+                          "temperature_min, temperature_max, temperature_sum / readings, "
+                          "voltage_min, voltage_max, voltage_sum / readings")
+HISTORY_COLUMNS = ("sensor_id", "time", "readings", "pressure_min", "pressure_max", "pressure_mean",
+                   "temperature_min", "temperature_max", "temperature_mean",
+                   "voltage_min", "voltage_max", "voltage_mean")
+
+
+def as_datetime(value):
+    # SQLite hands timestamps back as ISO text, MySQL as datetime
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def merge_open_buckets(rows, buckets, sensor_id=None, start=None, end=None):
+    # The rollup table only has buckets that were already closed and written. The open ones
+    # (RollupEngine.open_rows(), in ROLLUP_COLUMNS order) are folded in, so the latest minute or hour
+    # is not missing; a bucket written at a restart and continued since is summed with its row
+    merged = {}
+    for row in rows:
+        row = [row[0], as_datetime(row[1]), row[2]] + [None if v is None else float(v) for v in row[3:]]
+        merged[(row[0], row[1])] = row
+    for (bucket_sensor, _, bucket_start, count, *stats) in buckets:
+        if sensor_id and bucket_sensor != sensor_id:
+            continue
+        if (start is not None and bucket_start < start) or (end is not None and bucket_start > end):
+            continue
+        row = merged.get((bucket_sensor, bucket_start))
+        if row is None:
+            row = merged[(bucket_sensor, bucket_start)] = [bucket_sensor, bucket_start, 0] + [None] * 9
+        total = row[2] + count
+        # stats is min, max, sum for pressure, temperature and voltage; row holds min, max, mean
+        for i in range(3):
+            low, high, value_sum = stats[i * 3:i * 3 + 3]
+            col = 3 + i * 3
+            row[col] = low if row[col] is None else min(row[col], low)
+            row[col + 1] = high if row[col + 1] is None else max(row[col + 1], high)
+            row[col + 2] = ((row[col + 2] or 0.0) * row[2] + value_sum) / total
+        row[2] = total
+    return [tuple(row) for _, row in sorted(merged.items())]
+
+
+class ReadingQueries:
+    # Every query is shaped to be answered from the (sensor_id, timestamp) or (timestamp) index
+    def __init__(self, manager, database=DEFAULT_DATABASE, table=READINGS_TABLE):
+        self.manager = manager
+        self.database = database
+        self.table = quote(manager.dialect, table)
+        self.rollup_table = quote(manager.dialect, rollup_table(table))
+        self.alert_table = quote(manager.dialect, alert_table(table))
+
+    def where_clause(self, sensor_id=None, start=None, end=None, time_column="timestamp"):
+        ph = self.manager.placeholder
+        clauses = []
+        params = []
+        if sensor_id:
+            clauses.append(f"sensor_id = {ph}")
+            params.append(sensor_id)
+        if start is not None:
+            clauses.append(f"{time_column} >= {ph}")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{time_column} <= {ph}")
+            params.append(end)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def fetch(self, query, params=()):
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+        return rows
+
+    def _sensor_ids(self, cursor):
+        # Hop from one sensor to the next with MIN(sensor_id) > previous: one index seek per sensor
+        # rather than a scan of every row, which SQLite would otherwise do for DISTINCT
+        sensor_ids = []
+        cursor.execute(f"SELECT MIN(sensor_id) FROM {self.table}")
+        sensor_id = cursor.fetchone()[0]
+        query = f"SELECT MIN(sensor_id) FROM {self.table} WHERE sensor_id > {self.manager.placeholder}"
+        while sensor_id is not None:
+            sensor_ids.append(sensor_id)
+            cursor.execute(query, (sensor_id,))
+            sensor_id = cursor.fetchone()[0]
+        return sensor_ids
+
+    def sensors(self):
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            sensor_ids = self._sensor_ids(cursor)
+            cursor.close()
+        return sensor_ids
+
+    def latest(self, sensor_id):
+        rows = self.fetch(
+            f"SELECT {READING_COLUMNS} FROM {self.table} WHERE sensor_id = {self.manager.placeholder} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (sensor_id,),
+        )
+        return rows[0] if rows else None
+
+    def latest_per_sensor(self):
+        # A couple of index seeks per sensor instead of a GROUP BY over every row
+        query = (f"SELECT {READING_COLUMNS} FROM {self.table} WHERE sensor_id = {self.manager.placeholder} "
+                 f"ORDER BY timestamp DESC, id DESC LIMIT 1")
+        latest = {}
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            for sensor_id in self._sensor_ids(cursor):
+                cursor.execute(query, (sensor_id,))
+                row = cursor.fetchone()
+                if row:
+                    latest[sensor_id] = row
+            cursor.close()
+        return latest
+
+    def range(self, sensor_id=None, start=None, end=None, limit=None, newest_first=False):
+        where, params = self.where_clause(sensor_id, start, end)
+        order = "DESC" if newest_first else "ASC"
+        query = f"SELECT {READING_COLUMNS} FROM {self.table}{where} ORDER BY timestamp {order}, id {order}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return self.fetch(query, params)
+
+    def count(self, sensor_id=None, start=None, end=None):
+        where, params = self.where_clause(sensor_id, start, end)
+        return self.fetch(f"SELECT COUNT(*) FROM {self.table}{where}", params)[0][0]
+
+    def rollups(self, resolution, sensor_id=None, start=None, end=None):
+        where, params = self.where_clause(sensor_id, start, end, time_column="bucket_start")
+        where = (where + " AND" if where else " WHERE") + f" resolution = {self.manager.placeholder}"
+        params.append(resolution)
+        return self.fetch(
+            f"SELECT {ROLLUP_HISTORY_COLUMNS} FROM {self.rollup_table}{where} ORDER BY sensor_id, bucket_start",
+            params,
+        )
+
+    def history(self, sensor_id, start, end, max_points=1500, resolutions=RESOLUTIONS, open_buckets=None):
+        # Short spans come from raw rows; anything longer reads the finest rollup that fits max_points,
+        # so a month of history is ~720 hourly rows instead of millions of readings.
+        # open_buckets(resolution) returns the buckets a running scan has not written yet
+        if (end - start).total_seconds() <= max_points:
+            where, params = self.where_clause(sensor_id, start, end)
+            rows = self.fetch(f"SELECT {RAW_HISTORY_COLUMNS} FROM {self.table}{where} ORDER BY timestamp", params)
+            return 0, rows
+        resolution = pick_resolution(start, end, max_points, resolutions)
+        rows = self.rollups(resolution, sensor_id, start, end)
+        if open_buckets:
+            rows = merge_open_buckets(rows, open_buckets(resolution), sensor_id, start, end)
+        return resolution, rows
+
+    def delete_before(self, cutoff, chunk=5000, on_chunk=None):
+        # Chunked so a large purge never holds one long lock over the table the writer inserts into
+        ph = self.manager.placeholder
+        deleted = 0
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            # Walk the id range of the expired rows chunk ids at a time: ids follow insert order, not
+            # timestamps (a replayed spool brings old readings with new ids), so each DELETE is bounded
+            # by id and the timestamp test only picks the expired rows inside that range
+            cursor.execute(f"SELECT MIN(id), MAX(id) FROM {self.table} WHERE timestamp < {ph}", (cutoff,))
+            next_id, last_id = cursor.fetchone()
+            while next_id is not None and next_id <= last_id:
+                upper = min(next_id + chunk - 1, last_id)
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE id >= {ph} AND id <= {ph} AND timestamp < {ph}",
+                    (next_id, upper, cutoff),
+                )
+                conn.commit()
+                if cursor.rowcount:
+                    deleted += cursor.rowcount
+                    if on_chunk:
+                        on_chunk(deleted)
+                next_id = upper + 1
+            cursor.close()
+        return deleted
+
+    def delete_oldest(self, keep, chunk=5000, on_chunk=None):
+        # Size-based retention: everything older than the newest `keep` rows goes, one id range at a time
+        ph = self.manager.placeholder
+        deleted = 0
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id FROM {self.table} ORDER BY id DESC LIMIT 1 OFFSET {int(keep)}")
+            row = cursor.fetchone()
+            if row is not None:
+                last_id = row[0]
+                cursor.execute(f"SELECT MIN(id) FROM {self.table}")
+                next_id = cursor.fetchone()[0]
+                while next_id is not None and next_id <= last_id:
+                    upper = min(next_id + chunk - 1, last_id)
+                    cursor.execute(f"DELETE FROM {self.table} WHERE id <= {ph}", (upper,))
+                    conn.commit()
+                    deleted += cursor.rowcount
+                    if on_chunk:
+                        on_chunk(deleted)
+                    next_id = upper + 1
+            cursor.close()
+        return deleted
+
+    def clear(self, derived=False):
+        # TRUNCATE drops and recreates the table in one step instead of deleting row by row;
+        # SQLite's DELETE without WHERE takes the same shortcut
+        statement = "TRUNCATE TABLE" if self.manager.dialect == "mysql" else "DELETE FROM"
+        # Rollups and alert history outlive the raw rows unless derived=True asks for them too
+        tables = [self.table]
+        if derived:
+            tables += [self.rollup_table, self.alert_table]
+        with self.manager.connection(self.database) as conn:
+            cursor = conn.cursor()
+            for table in tables:
+                cursor.execute(f"{statement} {table}")
+            conn.commit()
+            cursor.close()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from itertools import count
+
+from tyremate_decode import FRAME_SIZE
+from tyremate_framestore import FrameStore, FRAME_DIR
+
+LOG_FILE = "tyremate_log.txt"
+SYNTHETIC_BASE_ID = 0x1000
+
+
+def load_log_frames(path=LOG_FILE):
+    frames = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        next(f, None)  # header
+        for line in f:
+            raw = line.rstrip().rsplit(",", 1)[-1]
+            try:
+                frames.append(bytes.fromhex(raw))
+            except ValueError:
+                continue
+    return frames
+
+
+def with_sensor_offset(frame, offset):
+    if offset == 0:
+        return frame
+    sensor_id = ((frame[1] << 8 | frame[2]) + offset) & 0xFFFF
+    return frame[:1] + sensor_id.to_bytes(2, "big") + frame[3:]
+
+
+def synthetic_frame(sensor_index, seq):
+    sensor_id = (SYNTHETIC_BASE_ID + sensor_index) & 0xFFFF
+    # ~32 PSI, 25 °C, 3.0 V; the unused bytes 3-4 carry a sequence number so frames never repeat
+    pressure_raw = 324 + seq % 8
+    frame = bytearray(FRAME_SIZE)
+    frame[0] = 0xA0
+    frame[1:3] = sensor_id.to_bytes(2, "big")
+    frame[3:5] = (seq & 0xFFFF).to_bytes(2, "big")
+    frame[5:7] = pressure_raw.to_bytes(2, "big")
+    frame[7] = 77
+    frame[8] = 150
+    return bytes(frame)
+
+
+class ReplaySource:
+    def __init__(self, frames=None, rate=10.0, sensors=1, limit=None):
+        self.base_frames = frames
+        self.rate = rate
+        self.sensors = max(1, sensors)
+        self.limit = limit
+        self.sent = 0
+        self.started_at = None
+        self.finished_at = None
+
+    @classmethod
+    def from_config(cls, config):
+        source = config.get("frame_source", "ble")
+        if source == "replay":
+            frames = load_log_frames(config.get("replay_file", LOG_FILE))
+        elif source == "store":
+            # Frames are read straight from the store's mmaps, however many there are
+            frames = FrameStore(config.get("frame_dir", FRAME_DIR)).view()
+        elif source == "synthetic":
+            frames = None
+        else:
+            return None
+        return cls(
+            frames,
+            rate=float(config.get("replay_rate", 10.0)),
+            sensors=int(config.get("replay_sensors", 1)),
+        )
+
+    def frames(self):
+        for seq in count():
+            if self.base_frames:
+                base = self.base_frames[seq % len(self.base_frames)]
+                for offset in range(self.sensors):
+                    yield with_sensor_offset(base, offset)
+            else:
+                for index in range(self.sensors):
+                    yield synthetic_frame(index, seq)
+
+    async def run(self, handler, keep_running=lambda: True):
+        # Pace against absolute targets so the rate holds even when handler time varies
+        self.sent = 0
+        self.started_at = time.perf_counter()
+        for frame in self.frames():
+            if not keep_running() or (self.limit is not None and self.sent >= self.limit):
+                break
+            handler(None, frame)
+            self.sent += 1
+            delay = self.started_at + self.sent / self.rate - time.perf_counter()
+            if delay > 0.001:
+                await asyncio.sleep(delay)
+            elif self.sent % 256 == 0:
+                await asyncio.sleep(0)
+        self.finished_at = time.perf_counter()
+
+    def achieved_rate(self):
+        end = self.finished_at or time.perf_counter()
+        if not self.started_at or end <= self.started_at:
+            return 0.0
+        return self.sent / (end - self.started_at)
@@ -0,0 +1,181 @@
+import glob
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from tyremate_db import DEFAULT_DATABASE, READINGS_TABLE, migrate_schema
+from tyremate_logfile import truncate_log
+from tyremate_queries import ReadingQueries
+from tyremate_qr import QR_DIR
+
+LOG_FILE = "tyremate_log.txt"
+FILE_CHUNK = 500
+MB = 1024 * 1024
+
+
+def files_by_age(paths):
+    # Oldest first, skipping anything that disappeared while listing
+    entries = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+    return entries
+
+
+class Retention:
+    def __init__(self, manager, database=DEFAULT_DATABASE, table=READINGS_TABLE, qr_dir=QR_DIR,
+                 log_path=LOG_FILE, chunk=5000, on_progress=None):
+        self.manager = manager
+        self.database = database
+        self.table = table
+        self.queries = ReadingQueries(manager, database, table)
+        self.qr_dir = qr_dir
+        self.log_path = log_path
+        self.chunk = chunk
+        self.on_progress = on_progress
+
+        # 0 disables a limit
+        self.row_days = 0.0
+        self.max_rows = 0
+        self.qr_days = 0.0
+        self.qr_max_mb = 0.0
+        self.log_days = 0.0
+        self.log_max_mb = 0.0
+
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.busy = False
+        self.deleted_rows = 0
+        self.deleted_files = 0
+
+    @classmethod
+    def from_config(cls, manager, config, on_progress=None):
+        retention = cls(manager, chunk=int(config.get("retention_chunk", 5000)), on_progress=on_progress)
+        retention.row_days = float(config.get("raw_retention_days", 0))
+        retention.max_rows = int(config.get("max_rows", 0))
+        retention.qr_days = float(config.get("qr_retention_days", 0))
+        retention.qr_max_mb = float(config.get("qr_max_mb", 0))
+        retention.log_days = float(config.get("log_retention_days", 0))
+        retention.log_max_mb = float(config.get("log_max_total_mb", 0))
+        return retention
+
+    def report(self, text):
+        if self.on_progress:
+            self.on_progress(text)
+
+    def submit(self, job, *args):
+        # One background thread runs jobs in order, so a purge never runs on the Tk or BLE threads
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="retention", daemon=True)
+            self.thread.start()
+        self.jobs.put((job, args))
+
+    def _run(self):
+        while True:
+            job, args = self.jobs.get()
+            if job is None:
+                break
+            self.busy = True
+            try:
+                job(*args)
+            except Exception as e:
+                self.report(f"❌ Retention failed: {e}")
+            finally:
+                self.busy = False
+
+    def close(self, timeout=2.0):
+        # Queued jobs finish first; timeout=0 lets the caller return while they do
+        if self.thread is not None:
+            self.jobs.put((None, ()))
+            self.thread.join(timeout)
+            self.thread = None
+
+    def purge_rows_before(self, cutoff):
+        total = self.queries.count(end=cutoff)
+        if not total:
+            return 0
+        deleted = self.queries.delete_before(
+            cutoff, self.chunk, on_chunk=lambda done: self.report(f"🧹 Deleting old readings: {done}/{total}")
+        )
+        self.deleted_rows += deleted
+        return deleted
+
+    def purge_rows_over(self, max_rows):
+        total = self.queries.count() - max_rows
+        if total <= 0:
+            return 0
+        deleted = self.queries.delete_oldest(
+            max_rows, self.chunk, on_chunk=lambda done: self.report(f"🧹 Trimming readings: {done}/{total}")
+        )
+        self.deleted_rows += deleted
+        return deleted
+
+    def clear_rows(self, derived=False):
+        self.report("🧹 Clearing all readings...")
+        # An older database is brought up to date first, so every table clear() empties exists
+        migrate_schema(self.manager, self.database, self.table)
+        self.queries.clear(derived)
+        self.report("✅ DB rows, rollups and alerts deleted" if derived else "✅ DB rows deleted")
+
+    def purge_files(self, paths, max_age_days=0, max_mb=0, label="files"):
+        entries = files_by_age(paths)
+        victims = []
+        if max_age_days:
+            cutoff = time.time() - max_age_days * 86400
+            victims = [entry for entry in entries if entry[0] < cutoff]
+            entries = entries[len(victims):]
+        if max_mb:
+            excess = sum(entry[1] for entry in entries) - max_mb * MB
+            for entry in entries:
+                if excess <= 0:
+                    break
+                victims.append(entry)
+                excess -= entry[1]
+        return self.remove_files([entry[2] for entry in victims], label)
+
+    def remove_files(self, paths, label="files"):
+        removed = 0
+        for i, path in enumerate(paths, 1):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            if i % FILE_CHUNK == 0:
+                self.report(f"🧹 Deleting {label}: {i}/{len(paths)}")
+        self.deleted_files += removed
+        return removed
+
+    def qr_files(self):
+        return glob.glob(os.path.join(self.qr_dir, "*.png"))
+
+    def rotated_logs(self):
+        stem, ext = os.path.splitext(self.log_path)
+        return glob.glob(f"{glob.escape(stem)}.*{ext}*")
+
+    def clear_qr(self):
+        removed = self.remove_files(self.qr_files(), "QR codes")
+        self.report(f"✅ {removed} QR codes deleted")
+
+    def clear_log(self):
+        truncate_log(self.log_path)
+        removed = self.remove_files(self.rotated_logs(), "rotated logs")
+        self.report(f"✅ Log file cleared, {removed} rotated logs deleted")
+
+    def enforce(self, include_rows=True):
+        rows = 0
+        if include_rows and self.row_days:
+            rows += self.purge_rows_before(datetime.fromtimestamp(time.time() - self.row_days * 86400))
+        if include_rows and self.max_rows:
+            rows += self.purge_rows_over(self.max_rows)
+        qr = self.purge_files(self.qr_files() if self.qr_days or self.qr_max_mb else [], self.qr_days, self.qr_max_mb, "QR codes")
+        logs = self.purge_files(self.rotated_logs() if self.log_days or self.log_max_mb else [], self.log_days, self.log_max_mb, "rotated logs")
+        if rows or qr or logs:
+            self.report(f"🧹 Retention removed {rows} readings, {qr} QR codes, {logs} rotated logs")
+        return rows, qr, logs
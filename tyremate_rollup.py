@@ -0,0 +1,127 @@
+import threading
+from datetime import datetime
+
+MINUTE = 60
+HOUR = 3600
+RESOLUTIONS = (MINUTE, HOUR)
+
+
+class Bucket:
+    __slots__ = ("sensor_id", "resolution", "start", "count",
+                 "p_min", "p_max", "p_sum", "t_min", "t_max", "t_sum", "v_min", "v_max", "v_sum")
+
+    def __init__(self, sensor_id, resolution, start, reading):
+        self.sensor_id = sensor_id
+        self.resolution = resolution
+        self.start = start
+        self.count = 1
+        self.p_min = self.p_max = self.p_sum = reading.pressure
+        self.t_min = self.t_max = self.t_sum = reading.temperature
+        self.v_min = self.v_max = self.v_sum = reading.voltage
+
+    def add(self, reading):
+        p, t, v = reading.pressure, reading.temperature, reading.voltage
+        self.count += 1
+        self.p_sum += p
+        self.t_sum += t
+        self.v_sum += v
+        if p < self.p_min:
+            self.p_min = p
+        elif p > self.p_max:
+            self.p_max = p
+        if t < self.t_min:
+            self.t_min = t
+        elif t > self.t_max:
+            self.t_max = t
+        if v < self.v_min:
+            self.v_min = v
+        elif v > self.v_max:
+            self.v_max = v
+
+    def row(self):
+        # Same order as tyremate_db.ROLLUP_COLUMNS
+        return (
+            self.sensor_id, self.resolution, datetime.fromtimestamp(self.start), self.count,
+            self.p_min, self.p_max, self.p_sum,
+            self.t_min, self.t_max, self.t_sum,
+            self.v_min, self.v_max, self.v_sum,
+        )
+
+
+class RollupEngine:
+    def __init__(self, on_close, resolutions=RESOLUTIONS):
+        self.on_close = on_close
+        self.resolutions = tuple(int(r) for r in resolutions)
+        # (sensor_id, resolution) -> the open bucket; O(1) state and work per reading
+        self.open = {}
+        self._lock = threading.Lock()
+
+        self.readings = 0
+        self.closed = 0
+        self.late = 0
+
+    def add(self, reading):
+        closed = []
+        received_at = reading.received_at
+        with self._lock:
+            self.readings += 1
+            for resolution in self.resolutions:
+                start = int(received_at // resolution * resolution)
+                key = (reading.sensor_id, resolution)
+                bucket = self.open.get(key)
+                if bucket is None:
+                    self.open[key] = Bucket(reading.sensor_id, resolution, start, reading)
+                elif bucket.start == start:
+                    bucket.add(reading)
+                elif start > bucket.start:
+                    closed.append(bucket)
+                    self.open[key] = Bucket(reading.sensor_id, resolution, start, reading)
+                else:
+                    # Out-of-order reading for a bucket already handed on; the upsert merges it in
+                    self.late += 1
+                    closed.append(Bucket(reading.sensor_id, resolution, start, reading))
+            self.closed += len(closed)
+        for bucket in closed:
+            self.on_close(bucket.row())
+
+    def close_idle(self, now):
+        # Buckets of sensors that went quiet would otherwise stay open until shutdown
+        with self._lock:
+            idle = [key for key, bucket in self.open.items() if now >= bucket.start + bucket.resolution]
+            closed = [self.open.pop(key) for key in idle]
+            self.closed += len(closed)
+        for bucket in closed:
+            self.on_close(bucket.row())
+        return len(closed)
+
+    def open_rows(self, resolution):
+        # Buckets still being filled, as the rows on_close will get once they close
+        with self._lock:
+            return [bucket.row() for (_, bucket_resolution), bucket in self.open.items()
+                    if bucket_resolution == resolution]
+
+    def flush_open(self):
+        with self._lock:
+            closed = list(self.open.values())
+            self.open.clear()
+            self.closed += len(closed)
+        for bucket in closed:
+            self.on_close(bucket.row())
+        return len(closed)
+
+    def stats(self):
+        return {
+            "readings": self.readings,
+            "open_buckets": len(self.open),
+            "closed_buckets": self.closed,
+            "late": self.late,
+        }
+
+
+def pick_resolution(start, end, max_points=1500, resolutions=RESOLUTIONS):
+    # The finest rollup that still keeps the result under max_points buckets per sensor
+    span = (end - start).total_seconds()
+    for resolution in sorted(resolutions):
+        if span / resolution <= max_points:
+            return resolution
+    return max(resolutions)
@@ -0,0 +1,105 @@
+import os
+import threading
+
+from tyremate_db import READINGS_TABLE, BatchWriter, SQLiteManager, insert_reading_query, migrate_schema, write_rows
+
+SPOOL_FILE = "tyremate_spool.sqlite"
+SPOOL_COLUMNS = "timestamp, sensor_id, pressure_psi, temperature, voltage, raw_data, qr_code_path, ingest_id"
+
+
+class Spool:
+    # A local SQLite copy of sensor_readings that takes readings while the real database is unreachable
+    def __init__(self, path=SPOOL_FILE, batch_size=500, flush_interval=0.5, on_error=None, on_rejected=None):
+        self.path = path
+        self.manager = SQLiteManager(path)
+        migrate_schema(self.manager, None)
+        self.writer = BatchWriter(
+            self.manager,
+            query=insert_reading_query("sqlite"),
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            on_error=on_error,
+        )
+        # Receives (row, error) for spooled rows the target refused; they leave the spool all the same
+        self.on_rejected = on_rejected
+        self._replay_lock = threading.Lock()
+        # The persist thread adds and the replay thread subtracts
+        self._pending_lock = threading.Lock()
+        with self.manager.connection() as conn:
+            self._pending = conn.execute(f"SELECT COUNT(*) FROM {READINGS_TABLE}").fetchone()[0]
+
+        self.spooled = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.replays = 0
+
+    def start(self):
+        self.writer.start()
+
+    def add(self, row):
+        # Counted before the row is queued, so a replay can never take it out before it was counted in
+        with self._pending_lock:
+            self.spooled += 1
+            self._pending += 1
+        self.writer.add(row)
+
+    def add_many(self, rows):
+        with self._pending_lock:
+            self.spooled += len(rows)
+            self._pending += len(rows)
+        for row in rows:
+            self.writer.add(row)
+
+    def pending(self):
+        return self._pending
+
+    def size_bytes(self):
+        return sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+
+    def replay(self, manager, database, chunk=5000):
+        # Oldest first in large batches; rows leave the spool only after the target committed them,
+        # and the idempotent insert makes a replay that died between commit and delete harmless
+        query = insert_reading_query(manager.dialect).replace("%s", manager.placeholder)
+        replayed = 0
+        with self._replay_lock:
+            self.writer.flush()
+            with self.manager.connection() as spool, manager.connection(database) as target:
+                while True:
+                    rows = spool.execute(
+                        f"SELECT id, {SPOOL_COLUMNS} FROM {READINGS_TABLE} ORDER BY id LIMIT {int(chunk)}"
+                    ).fetchall()
+                    if not rows:
+                        break
+                    # A row the target refuses would fail every later replay too, so it is handed
+                    # over and deleted with the rest instead of blocking the spool for good
+                    rejected = write_rows(manager, target, query, [row[1:] for row in rows])
+                    spool.execute(f"DELETE FROM {READINGS_TABLE} WHERE id <= ?", (rows[-1][0],))
+                    spool.commit()
+                    if rejected:
+                        self.rejected += len(rejected)
+                        if self.on_rejected:
+                            self.on_rejected(rejected)
+                    replayed += len(rows) - len(rejected)
+                    with self._pending_lock:
+                        self._pending = max(0, self._pending - len(rows))
+        if replayed:
+            self.replayed += replayed
+            self.replays += 1
+        return replayed
+
+    def close(self):
+        self.writer.close()
+
+    def stats(self):
+        return {
+            "pending": self.pending(),
+            "bytes": self.size_bytes(),
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+            "replays": self.replays,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return f"{s['pending']} spooled ({s['bytes'] / 1024:.0f} KiB), {s['replayed']} replayed"
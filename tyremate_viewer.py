@@ -0,0 +1,316 @@
+import queue
+import threading
+import tkinter as tk
+from datetime import datetime, timedelta
+from tkinter import filedialog, ttk
+
+from tyremate_export import EXPORT_CHUNK, Exporter, format_for
+from tyremate_queries import HISTORY_COLUMNS, ReadingQueries
+
+PAGE_SIZE = 200
+MAX_ROWS = 5000
+TAIL_INTERVAL_MS = 2000
+POLL_MS = 50
+# What History covers when From is left empty
+HISTORY_SPAN = timedelta(days=1)
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def parse_time(text):
+    text = text.strip()
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time '{text}' (use YYYY-MM-DD HH:MM:SS)")
+
+
+class TableViewer:
+    def __init__(self, parent, manager, db_name, table_name, page_size=PAGE_SIZE, max_rows=MAX_ROWS,
+                 export_chunk=EXPORT_CHUNK, open_buckets=None):
+        self.manager = manager
+        self.db_name = db_name
+        self.table_name = table_name
+        self.queries = ReadingQueries(manager, db_name, table_name)
+        # Rollup buckets a running scan has not written yet, merged into History
+        self.open_buckets = open_buckets
+        self.history_resolution = None
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.export_chunk = export_chunk
+        self.exporter = None
+        self.export_progress = queue.Queue()
+
+        self.columns = None
+        self.newest_id = None
+        self.oldest_id = None
+        self.has_more = True
+        self.loading = False
+        self.results = queue.Queue()
+        self.filters = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"{table_name} in {db_name}")
+        self.window.geometry("800x450")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.closed = False
+
+        self.sensor_var = tk.StringVar()
+        self.from_var = tk.StringVar()
+        self.to_var = tk.StringVar()
+        self.tail_var = tk.BooleanVar(value=False)
+        self.status_var = tk.StringVar(value="Loading...")
+
+        self.create_widgets()
+        self.reload()
+
+    def create_widgets(self):
+        filter_frame = ttk.Frame(self.window, padding=5)
+        filter_frame.pack(fill="x")
+        ttk.Label(filter_frame, text="Sensor:").pack(side="left")
+        ttk.Entry(filter_frame, textvariable=self.sensor_var, width=8).pack(side="left", padx=(0, 8))
+        ttk.Label(filter_frame, text="From:").pack(side="left")
+        ttk.Entry(filter_frame, textvariable=self.from_var, width=19).pack(side="left", padx=(0, 8))
+        ttk.Label(filter_frame, text="To:").pack(side="left")
+        ttk.Entry(filter_frame, textvariable=self.to_var, width=19).pack(side="left", padx=(0, 8))
+        ttk.Button(filter_frame, text="Apply", command=self.reload).pack(side="left")
+        ttk.Checkbutton(filter_frame, text="Live tail", variable=self.tail_var, command=self.tail).pack(side="left", padx=8)
+        ttk.Button(filter_frame, text="📈 History", command=self.show_history).pack(side="left")
+
+        tree_frame = ttk.Frame(self.window)
+        tree_frame.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(tree_frame, show="headings")
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        bottom = ttk.Frame(self.window, padding=5)
+        bottom.pack(fill="x")
+        ttk.Label(bottom, textvariable=self.status_var, foreground="gray").pack(side="left")
+        ttk.Button(bottom, text="Close", command=self.close).pack(side="right")
+        ttk.Button(bottom, text="Load more", command=self.load_older).pack(side="right", padx=5)
+        self.export_btn = ttk.Button(bottom, text="📤 Export", command=self.export)
+        self.export_btn.pack(side="right")
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Fetch the next page once the user nears the bottom of what is loaded
+        if float(last) >= 0.95:
+            self.load_older()
+
+    def where_clause(self, id_condition=None, id_value=None):
+        ph = self.manager.placeholder
+        clauses = []
+        params = []
+        if id_condition:
+            clauses.append(f"id {id_condition} {ph}")
+            params.append(id_value)
+        if self.filters.get("sensor_id"):
+            clauses.append(f"sensor_id = {ph}")
+            params.append(self.filters["sensor_id"])
+        if self.filters.get("start"):
+            clauses.append(f"timestamp >= {ph}")
+            params.append(self.filters["start"])
+        if self.filters.get("end"):
+            clauses.append(f"timestamp <= {ph}")
+            params.append(self.filters["end"])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def fetch(self, kind, query, params):
+        # Runs on a worker thread; results go back through self.results
+        try:
+            with self.manager.connection(self.db_name) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description]
+                cursor.close()
+            self.results.put((kind, columns, rows, None))
+        except Exception as e:
+            self.results.put((kind, None, None, e))
+
+    def start_fetch(self, kind, id_condition=None, id_value=None, order="DESC"):
+        if self.loading or self.closed:
+            return
+        where, params = self.where_clause(id_condition, id_value)
+        query = f"SELECT * FROM `{self.table_name}`{where} ORDER BY id {order} LIMIT {self.page_size}"
+        self.loading = True
+        threading.Thread(target=self.fetch, args=(kind, query, params), daemon=True).start()
+        self.window.after(POLL_MS, self.poll_results)
+
+    def poll_results(self):
+        if self.closed:
+            return
+        try:
+            kind, columns, rows, error = self.results.get_nowait()
+        except queue.Empty:
+            self.window.after(POLL_MS, self.poll_results)
+            return
+        self.loading = False
+        if error:
+            self.status_var.set(f"❌ View failed: {error}")
+            return
+        if self.columns != columns:
+            self.set_columns(columns)
+        if kind == "history":
+            self.show_history_rows(rows)
+            return
+        if kind == "tail":
+            self.prepend(rows)
+        else:
+            self.append(rows)
+        self.status_var.set(f"{len(self.tree.get_children())} rows loaded" + ("" if self.has_more else " (end of table)"))
+
+    def set_columns(self, columns):
+        self.columns = columns
+        self.tree.configure(columns=columns)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+
+    def append(self, rows):
+        for row in rows:
+            self.tree.insert("", "end", values=row)
+        if rows:
+            self.oldest_id = rows[-1][0]
+            if self.newest_id is None:
+                self.newest_id = rows[0][0]
+        self.has_more = len(rows) == self.page_size
+
+    def prepend(self, rows):
+        # Tail rows arrive oldest first, so inserting each at the top leaves the newest first
+        for row in rows:
+            self.tree.insert("", 0, values=row)
+        if rows:
+            self.newest_id = rows[-1][0]
+        children = self.tree.get_children()
+        if len(children) > self.max_rows:
+            self.tree.delete(*children[self.max_rows:])
+            self.oldest_id = int(self.tree.item(children[self.max_rows - 1], "values")[0])
+            self.has_more = True
+
+    def read_filters(self):
+        try:
+            self.filters = {
+                "sensor_id": self.sensor_var.get().strip().upper(),
+                "start": parse_time(self.from_var.get()),
+                "end": parse_time(self.to_var.get()),
+            }
+        except ValueError as e:
+            self.status_var.set(f"❌ {e}")
+            return False
+        return True
+
+    def reload(self):
+        if not self.read_filters():
+            return
+        if self.loading:
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.newest_id = None
+        self.oldest_id = None
+        self.has_more = True
+        self.start_fetch("page")
+
+    def load_older(self):
+        if not self.has_more or self.oldest_id is None:
+            return
+        self.start_fetch("page", "<", self.oldest_id)
+
+    def tail(self):
+        if self.closed or not self.tail_var.get():
+            return
+        if self.newest_id is None:
+            self.start_fetch("page")
+        else:
+            # Only rows newer than what is on screen are read, so a refresh costs one index range scan
+            self.start_fetch("tail", ">", self.newest_id, order="ASC")
+        self.window.after(TAIL_INTERVAL_MS, self.tail)
+
+    def show_history(self):
+        # Min/max/mean per bucket over the filtered span: raw rows when it is short, rollups otherwise
+        if self.loading or self.closed or not self.read_filters():
+            return
+        end = self.filters["end"] or datetime.now()
+        start = self.filters["start"] or end - HISTORY_SPAN
+        self.tail_var.set(False)
+        self.loading = True
+        threading.Thread(target=self.fetch_history, args=(start, end), daemon=True).start()
+        self.window.after(POLL_MS, self.poll_results)
+
+    def fetch_history(self, start, end):
+        try:
+            self.history_resolution, rows = self.queries.history(
+                self.filters["sensor_id"] or None, start, end, open_buckets=self.open_buckets
+            )
+            self.results.put(("history", list(HISTORY_COLUMNS), rows, None))
+        except Exception as e:
+            self.results.put(("history", None, None, e))
+
+    def show_history_rows(self, rows):
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", values=row)
+        # Paging and the live tail follow ids, which history rows do not have; Apply goes back to the table
+        self.newest_id = None
+        self.oldest_id = None
+        self.has_more = False
+        resolution = self.history_resolution
+        if not resolution:
+            source = "raw readings"
+        elif resolution % 3600 == 0:
+            source = f"{resolution // 3600}-hour rollups"
+        elif resolution % 60 == 0:
+            source = f"{resolution // 60}-minute rollups"
+        else:
+            source = f"{resolution}-second rollups"
+        self.status_var.set(f"📈 {len(rows)} points from {source} (Apply returns to the table)")
+
+    def export(self):
+        if self.exporter and self.exporter.running:
+            self.exporter.cancel()
+            return
+        if not self.read_filters():
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.window, title="Export readings", defaultextension=".csv",
+            initialfile=f"{self.table_name}.csv",
+            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")],
+        )
+        if not path:
+            return
+        # The whole filtered table is streamed in chunks on the exporter's thread, not just the loaded rows
+        self.exporter = Exporter(
+            self.manager, self.db_name, self.table_name, chunk=self.export_chunk, on_progress=self.export_progress.put
+        )
+        self.exporter.start(
+            path, format_for(path), self.filters["sensor_id"], self.filters["start"], self.filters["end"]
+        )
+        self.export_btn.config(text="⏹️ Cancel Export")
+        self.status_var.set("📤 Exporting...")
+        self.window.after(POLL_MS, self.poll_export)
+
+    def poll_export(self):
+        if self.closed:
+            return
+        try:
+            while True:
+                text = self.export_progress.get_nowait()
+                if text is None:
+                    self.export_btn.config(text="📤 Export")
+                    return
+                self.status_var.set(text)
+        except queue.Empty:
+            pass
+        self.window.after(POLL_MS, self.poll_export)
+
+    def close(self):
+        self.closed = True
+        if self.exporter:
+            self.exporter.cancel()
+        self.window.destroy()